@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from . import authentication  # noqa: F401
+        from .caching import invalidate_on_change
+        from .models import Author, Book
+
+        invalidate_on_change(Author, Book)
@@ -0,0 +1,78 @@
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db.models import Case, Value, When
+from django.db.models.functions import Mod
+from django.db.models.lookups import Exact
+
+from api.models import Author, Book
+
+AUTHOR_PREFIX = 'Author '
+BOOK_PREFIX = 'Book '
+USER_PREFIX = 'reader'
+
+
+def insert_missing(model, field, prefix, keys, build, batch_size):
+    """
+    Bulk-insert ``build(i, key)`` for every ``key`` in ``keys`` whose ``field``
+    value isn't in the table yet, so reruns only add what is missing.
+    Returns the number of rows actually inserted.
+    """
+    # One scan for the seeded rows; a lookup per batch would scan per batch
+    seeded = model.objects.filter(**{f'{field}__startswith': prefix})
+    existing = set(seeded.values_list(field, flat=True).iterator())
+    for start in range(0, len(keys), batch_size):
+        batch = [
+            build(i, key) for i, key in enumerate(keys[start:start + batch_size], start) if key not in existing
+        ]
+        model.objects.bulk_create(batch, ignore_conflicts=True)
+    # ignore_conflicts doesn't say which rows it skipped, so count what landed
+    return seeded.count() - len(existing)
+
+
+class Command(BaseCommand):
+    help = 'Seed a synthetic catalog of users, authors and books of any size; safe to rerun.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=3)
+        parser.add_argument('--authors', type=int, default=10)
+        parser.add_argument('--books', type=int, default=100)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--password', default='password123', help='Password of every seeded user.')
+
+    def handle(self, *args, users, authors, books, batch_size, password, **options):
+        users, authors = max(users, 1), max(authors, 1)
+        # Hashing is deliberately slow, so every seeded user shares one hash
+        password = make_password(password)
+        usernames = [f'{USER_PREFIX}{i:04d}' for i in range(users)]
+        created_users = insert_missing(User, 'username', USER_PREFIX, usernames, lambda i, name: User(
+            username=name, email=f'{name}@example.com', password=password,
+        ), batch_size)
+
+        names = [f'{AUTHOR_PREFIX}{i:06d}' for i in range(authors)]
+        created_authors = insert_missing(Author, 'name', AUTHOR_PREFIX, names, lambda i, name: Author(
+            name=name,
+        ), batch_size)
+        author_ids = [pk for _, pk in sorted(
+            Author.objects.filter(name__startswith=AUTHOR_PREFIX).values_list('name', 'pk')
+        )][:authors]
+
+        user_ids = list(
+            User.objects.filter(username__startswith=USER_PREFIX).order_by('username').values_list('pk', flat=True)[:users]
+        )
+        titles = [f'{BOOK_PREFIX}{i:07d}' for i in range(books)]
+        created_books = insert_missing(Book, 'title', BOOK_PREFIX, titles, lambda i, title: Book(
+            title=title,
+            publication_year=1900 + i % 125,
+            author_id=author_ids[i % len(author_ids)],
+            owner_id=user_ids[0],
+        ), batch_size)
+
+        # Spread ownership round-robin over the seeded users in one UPDATE
+        Book.objects.filter(title__startswith=BOOK_PREFIX).update(owner=Case(
+            *[When(Exact(Mod('pk', len(user_ids)), slot), then=Value(pk)) for slot, pk in enumerate(user_ids)]
+        ))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created_users} users, {created_authors} authors and {created_books} books.'
+        ))
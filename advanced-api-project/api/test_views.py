@@ -1,8 +1,16 @@
-from django.test import TestCase
+import json
+from io import StringIO
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django.core.management import call_command
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 from rest_framework import status
-from .models import Book
+from .authentication import local_tokens
+from .models import Author, Book
 
 class BookAPITestCase(TestCase):
     def setUp(self):
@@ -96,3 +104,126 @@ class BookAPITestCase(TestCase):
         # Attempt to access book list without authentication
         response = self.client.get('/api/books/')
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+# The test runner is a single process, so its LocMemCache is shared enough
+@override_settings(RESPONSE_CACHE_ALLOW_LOCAL=True)
+class ResponseCacheTestCase(TestCase):
+    def setUp(self):
+        # Start from an empty cache so earlier tests can't produce hits
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username='reader', password='testpassword')
+        self.client.force_authenticate(self.user)
+        self.author = Author.objects.create(name='Cached Author')
+
+    def test_author_list_is_cached_until_a_book_changes(self):
+        # The second read is served from the cache
+        self.assertEqual(self.client.get('/authors/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/authors/')['X-Cache'], 'HIT')
+
+        # Saving a book bumps the Book version once the transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(title='New Book', publication_year=2020, author=self.author, owner=self.user)
+        response = self.client.get('/authors/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data[0]['books'][0]['title'], 'New Book')
+
+    def test_unchanged_book_returns_304(self):
+        # The detail response carries both validators
+        book = Book.objects.create(title='Polled', publication_year=2020, author=self.author, owner=self.user)
+        response = self.client.get(f'/books/{book.pk}/')
+        self.assertIn('Last-Modified', response)
+
+        # Either validator short-circuits to 304 while the book is unchanged
+        etag = response['ETag']
+        self.assertEqual(self.client.get(f'/books/{book.pk}/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        since = response['Last-Modified']
+        self.assertEqual(self.client.get(f'/books/{book.pk}/', HTTP_IF_MODIFIED_SINCE=since).status_code, 304)
+
+        # Editing the book changes its ETag
+        book.title = 'Edited'
+        with self.captureOnCommitCallbacks(execute=True):
+            book.save()
+        self.assertEqual(self.client.get(f'/books/{book.pk}/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class BookExportTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username='exporter', password='testpassword')
+        tolkien = Author.objects.create(name='Tolkien')
+        pratchett = Author.objects.create(name='Pratchett')
+        Book.objects.create(title='The Hobbit', publication_year=1937, author=tolkien, owner=self.user)
+        Book.objects.create(title='Mort, "Discworld"', publication_year=1987, author=pratchett, owner=self.user)
+        Book.objects.create(title='Silmarillion', publication_year=1977, author=tolkien, owner=self.user)
+
+    def export(self, export_format, **params):
+        response = self.client.get(f'/books/export/{export_format}/', params)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_honors_search_and_ordering(self):
+        lines = self.export('csv', search='tolkien', ordering='-publication_year').splitlines()
+        self.assertEqual(lines[0], 'id,title,publication_year,author,owner')
+        self.assertEqual([line.split(',')[1] for line in lines[1:]], ['Silmarillion', 'The Hobbit'])
+        self.assertIn('"Mort, ""Discworld"""', self.export('csv'))
+
+    def test_ndjson_is_one_object_per_line(self):
+        rows = [json.loads(line) for line in self.export('ndjson', ordering='publication_year').splitlines()]
+        self.assertEqual([row['publication_year'] for row in rows], [1937, 1977, 1987])
+        self.assertEqual(rows[0]['author'], 'Tolkien')
+
+    def test_unknown_format_is_not_found(self):
+        self.assertEqual(self.client.get('/books/export/xml/').status_code, 404)
+
+
+class SeedCatalogTestCase(TestCase):
+    def seed(self, **options):
+        stdout = StringIO()
+        call_command('seed_catalog', stdout=stdout, **options)
+        return stdout.getvalue().strip()
+
+    def test_rerunning_only_adds_what_is_missing(self):
+        self.seed(users=2, authors=3, books=10, batch_size=4)
+        output = self.seed(users=2, authors=3, books=12, batch_size=4)
+        self.assertEqual(output, 'Created 0 users, 0 authors and 2 books.')
+        self.assertEqual(Author.objects.count(), 3)
+        self.assertEqual(Book.objects.count(), 12)
+        owners = Book.objects.values_list('owner__username', flat=True).distinct()
+        self.assertEqual(sorted(owners), ['reader0000', 'reader0001'])
+
+
+class CachedTokenAuthenticationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_tokens.clear()
+        self.user = get_user_model().objects.create_user(username='tokenholder', password='testpassword')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def token_queries(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/authors/')
+        return response.status_code, sum('authtoken_token' in query['sql'] for query in captured)
+
+    def test_token_is_loaded_once(self):
+        self.assertEqual(self.token_queries(), (200, 1))
+        self.assertEqual(self.token_queries(), (200, 0))
+
+    def test_cached_inactive_user_is_rejected(self):
+        self.token_queries()
+        local_tokens.clear()
+        # Skips the signal, so the shared entry still says active
+        get_user_model().objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.get('/authors/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data['detail'], 'User inactive or deleted.')
+
+    def test_rotated_token_is_rejected(self):
+        self.token_queries()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+            Token.objects.create(user=self.user)
+        self.assertEqual(self.client.get('/authors/').status_code, status.HTTP_401_UNAUTHORIZED)
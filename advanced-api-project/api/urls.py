@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AuthorViewSet, BookViewSet, ListView, CreateView, DetailView, UpdateView, DeleteView , BookListView
+from .views import AuthorViewSet, BookViewSet, ListView, CreateView, DetailView, UpdateView, DeleteView , BookListView, BookExportView
 from rest_framework.authtoken.views import obtain_auth_token
 
 router = DefaultRouter()
@@ -12,6 +12,7 @@ urlpatterns = [
     path('', include(router.urls)),
     path('books/', BookListView.as_view(), name='book-list'),
     path('books/list/', ListView.as_view(), name='book-list'),
+    path('books/export/<str:export_format>/', BookExportView.as_view(), name='book-export'),  # CSV or NDJSON
     path('books/create/', CreateView.as_view(), name='book-create'),
     path('books/detail/<int:pk>/', DetailView.as_view(), name='book-detail'),
     path('books/update/<int:pk>/', UpdateView.as_view(), name='book-update'),
@@ -1,22 +1,27 @@
+from .authentication import CachedTokenAuthentication
+from .caching import CachedResponseMixin
+from .conditional import ConditionalGetMixin
+from .export import StreamingExportMixin
 from .models import Author, Book
 from .serializers import AuthorSerializer, BookSerializer
 from rest_framework import generics, viewsets
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
-from rest_framework.authentication import TokenAuthentication
 from django_filters.rest_framework import DjangoFilterBackend
 from django_filters import rest_framework 
 from rest_framework import filters
 
 
 # ViewSet for Author model
-class AuthorViewSet(viewsets.ModelViewSet):
+class AuthorViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    # Authors are serialized with their books
+    cache_models = (Author, Book)
     # Prefetch related books to reduce database queries for each author
     queryset = Author.objects.all().prefetch_related('books')
     serializer_class = AuthorSerializer
     
     # Overriding the default queryset to allow filtering by 'name' via query params
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = super().get_queryset()
         # Check if 'name' is provided in query params to filter authors by name (case-insensitive)
         name_filter = self.request.query_params.get('name', None)
         if name_filter is not None:
@@ -25,14 +30,14 @@ class AuthorViewSet(viewsets.ModelViewSet):
     
 
 # ViewSet for Book model
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     # Set the default queryset to retrieve all books
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     
     # Overriding the default queryset to allow filtering by 'author' name via query params
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = super().get_queryset()
         # Check if 'author' is provided in query params to filter books by author's name (case-insensitive)
         author_name = self.request.query_params.get('author', None)
         if author_name is not None:
@@ -40,18 +45,34 @@ class BookViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-# API View for listing and creating books
-class BookListView(generics.ListCreateAPIView):
-    queryset = Book.objects.all()  # Fetch all books
-    serializer_class = BookSerializer  # Serialize the books data
-    
-    # Add filter, search, and ordering functionality to the view
+# Filter, search, and ordering functionality shared by the book list and its export
+class BookFilteringMixin:
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['author']  # Allow filtering by author
-    search_fields = ['title', 'author']  # Allow search by book title and author
+    search_fields = ['title', 'author__name']  # Allow search by book title and author name
     ordering_fields = ['publication_year']  # Allow ordering by publication year
+
+
+# API View for listing and creating books
+class BookListView(BookFilteringMixin, generics.ListCreateAPIView):
+    queryset = Book.objects.all()  # Fetch all books
+    serializer_class = BookSerializer  # Serialize the books data
     
 
+# API View streaming the filtered books as CSV or NDJSON, one row at a time
+class BookExportView(BookFilteringMixin, StreamingExportMixin, generics.GenericAPIView):
+    queryset = Book.objects.select_related('author')
+    permission_classes = [IsAuthenticatedOrReadOnly]  # Same read access as ListView
+    export_filename = 'books'
+    export_fields = {
+        'id': 'id',
+        'title': 'title',
+        'publication_year': 'publication_year',
+        'author': 'author__name',
+        'owner': 'owner__username',
+    }
+
+
 # API View for listing all books with read-only permissions for unauthenticated users
 class ListView(generics.ListAPIView):
     queryset = Book.objects.all()  # Fetch all books
@@ -61,7 +82,7 @@ class ListView(generics.ListAPIView):
 
 # API View for creating a new book, authentication required
 class CreateView(generics.CreateAPIView):
-    authentication_classes = [TokenAuthentication]  # Use token-based authentication
+    authentication_classes = [CachedTokenAuthentication]  # Use token-based authentication
     permission_classes = [IsAuthenticated]  # Only authenticated users can create
     queryset = Book.objects.all()  # Fetch all books
     serializer_class = BookSerializer  # Serialize the books data
@@ -76,7 +97,7 @@ class DetailView(generics.RetrieveUpdateDestroyAPIView):
 
 # API View for updating a book, authentication required
 class UpdateView(generics.RetrieveUpdateDestroyAPIView):
-    authentication_classes = [TokenAuthentication]  # Use token-based authentication
+    authentication_classes = [CachedTokenAuthentication]  # Use token-based authentication
     permission_classes = [IsAuthenticated]  # Only authenticated users can update
     queryset = Book.objects.all()  # Fetch all books
     serializer_class = BookSerializer  # Serialize the books data
@@ -84,7 +105,7 @@ class UpdateView(generics.RetrieveUpdateDestroyAPIView):
 
 # API View for deleting a book, authentication required
 class DeleteView(generics.RetrieveUpdateDestroyAPIView):
-    authentication_classes = [TokenAuthentication]  # Use token-based authentication
+    authentication_classes = [CachedTokenAuthentication]  # Use token-based authentication
     permission_classes = [IsAuthenticated]  # Only authenticated users can delete
     queryset = Book.objects.all()  # Fetch all books
     serializer_class = BookSerializer  # Serialize the books data
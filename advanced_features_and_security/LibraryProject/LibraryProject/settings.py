@@ -96,11 +96,31 @@ DATABASES = {
     }
 }
 
+# Cache
+# Local memory by default; point CACHE_BACKEND at
+# django.core.cache.backends.redis.RedisCache and CACHE_LOCATION at
+# redis://host:6379/0 to share cached permissions between processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
 AUTH_USER_MODEL = 'bookshelf.CustomUser'
 
+# ModelBackend with users' permissions cached across requests. ModelBackend
+# stays listed so sessions created before CachedModelBackend keep working;
+# new logins are recorded against the first backend.
+AUTHENTICATION_BACKENDS = [
+    'bookshelf.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
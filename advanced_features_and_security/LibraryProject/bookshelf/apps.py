@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class BookshelfConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bookshelf'
+
+    def ready(self):
+        # Bump the permission cache version when permissions change
+        from . import signals  # noqa: F401
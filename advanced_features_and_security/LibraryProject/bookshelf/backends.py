@@ -0,0 +1,86 @@
+"""Authentication backend that keeps permissions in the cache between requests.
+
+``ModelBackend`` memoizes a user's permissions on the user object, which only
+lives for one request, so every ``permission_required`` view loads them again
+with joins over the user, group and permission tables. ``CachedModelBackend``
+also stores them in the default cache under the user id and a global
+permission version. The receivers in ``bookshelf.signals`` bump that version
+whenever group permissions, user permissions or group memberships change, so
+a warm permission check costs no queries.
+
+The version only reaches other processes through a shared cache such as
+Redis or Memcached. With a process-local one (``LocMemCache``, the default
+here) other workers would keep granting a revoked permission until their
+entry expired, so permissions are then loaded per request as ``ModelBackend``
+does, unless ``BOOKSHELF_PERMISSION_CACHE_ALLOW_LOCAL`` is set for a
+single-process setup.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+VERSION_KEY = 'bookshelf:permissions:version'
+DEFAULT_TIMEOUT = 3600
+
+
+def cache_timeout():
+    return getattr(settings, 'BOOKSHELF_PERMISSION_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def caching_enabled():
+    process_local = isinstance(caches['default'], (LocMemCache, DummyCache))
+    return not process_local or getattr(settings, 'BOOKSHELF_PERMISSION_CACHE_ALLOW_LOCAL', False)
+
+
+def permissions_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock so an evicted version never repeats an old one
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_permissions_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+class CachedModelBackend(ModelBackend):
+    def _cached(self, user_obj, kind, load):
+        if not caching_enabled():
+            return load()
+        # Superusers hold every permission, so the flag is part of the key
+        key = f'bookshelf:permissions:{permissions_version()}:{kind}:{user_obj.pk}:{int(user_obj.is_superuser)}'
+        perms = cache.get(key)
+        if perms is None:
+            perms = load()
+            cache.set(key, perms, cache_timeout())
+        return perms
+
+    def _get_permissions(self, user_obj, obj, from_name):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        perm_cache_name = f'_{from_name}_perm_cache'
+        if not hasattr(user_obj, perm_cache_name):
+            perms = self._cached(
+                user_obj, from_name, lambda: super(CachedModelBackend, self)._get_permissions(user_obj, obj, from_name)
+            )
+            setattr(user_obj, perm_cache_name, perms)
+        return getattr(user_obj, perm_cache_name)
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            # One cache read instead of one each for user and group permissions
+            user_obj._perm_cache = self._cached(
+                user_obj, 'all', lambda: super(CachedModelBackend, self).get_all_permissions(user_obj)
+            )
+        return user_obj._perm_cache
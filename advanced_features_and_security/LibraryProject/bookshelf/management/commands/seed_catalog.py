@@ -0,0 +1,103 @@
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+
+from bookshelf.models import Author, Book, CustomUser, Librarian, Library, UserProfile
+
+AUTHOR_PREFIX = 'Author '
+BOOK_PREFIX = 'Book '
+LIBRARY_PREFIX = 'Library '
+USER_PREFIX = 'member'
+
+
+def insert_missing(model, field, prefix, keys, build, batch_size):
+    """
+    Bulk-insert ``build(i, key)`` for every ``key`` in ``keys`` whose ``field``
+    value isn't in the table yet, so reruns only add what is missing.
+    Returns the number of rows actually inserted.
+    """
+    # One scan for the seeded rows; a lookup per batch would scan per batch
+    seeded = model.objects.filter(**{f'{field}__startswith': prefix})
+    existing = set(seeded.values_list(field, flat=True).iterator())
+    for start in range(0, len(keys), batch_size):
+        batch = [
+            build(i, key) for i, key in enumerate(keys[start:start + batch_size], start) if key not in existing
+        ]
+        model.objects.bulk_create(batch, ignore_conflicts=True)
+    # ignore_conflicts doesn't say which rows it skipped, so count what landed
+    return seeded.count() - len(existing)
+
+
+class Command(BaseCommand):
+    help = 'Seed a synthetic catalog of members, authors, books and libraries of any size; safe to rerun.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=3)
+        parser.add_argument('--authors', type=int, default=10)
+        parser.add_argument('--books', type=int, default=100)
+        parser.add_argument('--libraries', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--password', default='password123', help='Password of every seeded user.')
+
+    def handle(self, *args, users, authors, books, libraries, batch_size, password, **options):
+        authors = max(authors, 1)
+        # Hashing is deliberately slow, so every seeded user shares one hash
+        password = make_password(password)
+        usernames = [f'{USER_PREFIX}{i:04d}' for i in range(users)]
+        created_users = insert_missing(CustomUser, 'username', USER_PREFIX, usernames, lambda i, name: CustomUser(
+            username=name, email=f'{name}@example.com', password=password,
+        ), batch_size)
+        user_ids = CustomUser.objects.filter(username__startswith=USER_PREFIX).values_list('pk', flat=True)
+        UserProfile.objects.bulk_create(
+            [UserProfile(user_id=pk, role='Member') for pk in user_ids.iterator()],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
+        names = [f'{AUTHOR_PREFIX}{i:06d}' for i in range(authors)]
+        created_authors = insert_missing(Author, 'name', AUTHOR_PREFIX, names, lambda i, name: Author(
+            name=name,
+        ), batch_size)
+        author_ids = [pk for _, pk in sorted(
+            Author.objects.filter(name__startswith=AUTHOR_PREFIX).values_list('name', 'pk')
+        )][:authors]
+
+        titles = [f'{BOOK_PREFIX}{i:07d}' for i in range(books)]
+        created_books = insert_missing(Book, 'title', BOOK_PREFIX, titles, lambda i, title: Book(
+            title=title,
+            isbn=f'{i:013d}',
+            author_id=author_ids[i % len(author_ids)],
+        ), batch_size)
+
+        names = [f'{LIBRARY_PREFIX}{i:04d}' for i in range(libraries)]
+        created_libraries = insert_missing(Library, 'name', LIBRARY_PREFIX, names, lambda i, name: Library(
+            name=name,
+        ), batch_size)
+        library_ids = [pk for _, pk in sorted(
+            Library.objects.filter(name__startswith=LIBRARY_PREFIX).values_list('name', 'pk')
+        )][:libraries]
+        if library_ids:
+            # Librarian.library is one-to-one, so existing librarians conflict and are skipped
+            Librarian.objects.bulk_create(
+                [Librarian(name=f'Librarian {i:04d}', library_id=pk) for i, pk in enumerate(library_ids)],
+                batch_size=batch_size,
+                ignore_conflicts=True,
+            )
+            self.shelve_books(library_ids, batch_size)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created_users} users, {created_authors} authors, {created_books} books '
+            f'and {created_libraries} libraries.'
+        ))
+
+    def shelve_books(self, library_ids, batch_size):
+        # Book i goes to library i % libraries, written straight to the through table
+        Shelf = Library.books.through
+        books = Book.objects.filter(title__startswith=BOOK_PREFIX).values_list('pk', 'title')
+        batch = []
+        for pk, title in books.iterator(chunk_size=batch_size):
+            library_id = library_ids[int(title[len(BOOK_PREFIX):]) % len(library_ids)]
+            batch.append(Shelf(library_id=library_id, book_id=pk))
+            if len(batch) == batch_size:
+                Shelf.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        Shelf.objects.bulk_create(batch, ignore_conflicts=True)
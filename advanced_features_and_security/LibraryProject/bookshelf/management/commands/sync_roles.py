@@ -0,0 +1,34 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookshelf.roles import ROLES, sync_roles
+
+
+class Command(BaseCommand):
+    help = (
+        'Make groups, their permissions and memberships match a declarative spec: '
+        'the built-in roles or a JSON file of {"Group": {"permissions": [...], "users": [...]}}.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('spec', nargs='?', help='JSON spec file; defaults to the built-in roles.')
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without applying them.')
+
+    def handle(self, *args, spec, dry_run, **options):
+        if spec:
+            with open(spec) as spec_file:
+                roles = json.load(spec_file)
+        else:
+            roles = ROLES
+        try:
+            changes = sync_roles(roles, dry_run=dry_run)
+        except ValueError as error:
+            raise CommandError(error)
+
+        prefix = 'Would apply' if dry_run else 'Applied'
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}: {len(changes["groups_created"])} groups created, '
+            f'{changes["permissions_added"]} permissions added, {changes["permissions_removed"]} removed, '
+            f'{changes["members_added"]} members added, {changes["members_removed"]} removed.'
+        ))
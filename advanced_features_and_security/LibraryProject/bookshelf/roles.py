@@ -0,0 +1,140 @@
+"""Declarative groups, permissions and memberships for the bookshelf.
+
+A spec maps each group name to the permissions it grants, written as
+``app_label.codename``, and optionally to the users who belong to it, by
+``USERNAME_FIELD``. ``sync_roles()`` makes the database match a spec in a
+handful of queries, however many groups, permissions or users it lists.
+Names are resolved in bulk, the current state is read in one query per
+through table, and only the difference is written: bulk inserts for
+missing rows and one delete per table for surplus ones. Groups that list
+``users`` get exactly those members; other groups' members are left alone.
+
+``manage.py sync_roles`` applies ``ROLES`` or a JSON spec file.
+"""
+from functools import reduce
+from operator import or_
+
+from django.contrib.auth.models import Group, Permission
+from django.db import transaction
+from django.db.models import Q
+
+from .backends import bump_permissions_version
+from .models import CustomUser
+
+BATCH_SIZE = 1000
+
+BOOK_VIEW = ['bookshelf.can_view_book', 'bookshelf.can_view_library']
+BOOK_EDIT = ['bookshelf.can_create_book', 'bookshelf.can_edit_book',
+             'bookshelf.can_create_library', 'bookshelf.can_edit_library']
+BOOK_DELETE = ['bookshelf.can_delete_book', 'bookshelf.can_delete_library']
+
+ROLES = {
+    'Admins': {'permissions': BOOK_VIEW + BOOK_EDIT + BOOK_DELETE},
+    'Editors': {'permissions': BOOK_VIEW + BOOK_EDIT},
+    'Viewers': {'permissions': BOOK_VIEW},
+}
+
+
+def resolve_permissions(names):
+    """Map ``app_label.codename`` names to permission ids in one query."""
+    codenames = set()
+    for name in names:
+        app_label, _, codename = name.partition('.')
+        if not app_label or not codename:
+            raise ValueError(f'Permission "{name}" is not in app_label.codename form')
+        codenames.add(codename)
+    rows = Permission.objects.filter(codename__in=codenames).values_list(
+        'content_type__app_label', 'codename', 'pk'
+    )
+    found = {f'{app_label}.{codename}': pk for app_label, codename, pk in rows}
+    missing = set(names) - found.keys()
+    if missing:
+        raise ValueError(f'Unknown permissions: {", ".join(sorted(missing))}')
+    return found
+
+
+def resolve_users(identifiers):
+    """Map ``USERNAME_FIELD`` values to user ids, a batch per query."""
+    field = CustomUser.USERNAME_FIELD
+    identifiers = list(set(identifiers))
+    found = {}
+    for start in range(0, len(identifiers), BATCH_SIZE):
+        batch = identifiers[start:start + BATCH_SIZE]
+        found.update(CustomUser.objects.filter(**{f'{field}__in': batch}).values_list(field, 'pk'))
+    missing = set(identifiers) - found.keys()
+    if missing:
+        raise ValueError(f'Unknown users: {", ".join(sorted(missing))}')
+    return found
+
+
+def _apply(through, owner_field, target_field, current, desired):
+    """Insert ``desired - current`` and delete ``current - desired``."""
+    added = desired - current
+    through.objects.bulk_create(
+        [through(**{owner_field: owner, target_field: target}) for owner, target in added],
+        batch_size=BATCH_SIZE,
+    )
+    removed = current - desired
+    if removed:
+        by_owner = {}
+        for owner, target in removed:
+            by_owner.setdefault(owner, []).append(target)
+        through.objects.filter(reduce(or_, (
+            Q(**{owner_field: owner, f'{target_field}__in': targets}) for owner, targets in by_owner.items()
+        ))).delete()
+    return len(added), len(removed)
+
+
+def sync_roles(spec, dry_run=False):
+    """Make groups, their permissions and listed memberships match ``spec``.
+
+    Returns counts of what changed (or would change, with ``dry_run``).
+    """
+    permission_ids = resolve_permissions(
+        {name for role in spec.values() for name in role.get('permissions', ())}
+    )
+    user_ids = resolve_users(
+        {user for role in spec.values() for user in role.get('users', ())}
+    )
+
+    with transaction.atomic():
+        groups = dict(Group.objects.filter(name__in=spec).values_list('name', 'pk'))
+        created = sorted(set(spec) - groups.keys())
+        if created:
+            Group.objects.bulk_create([Group(name=name) for name in created])
+            groups = dict(Group.objects.filter(name__in=spec).values_list('name', 'pk'))
+
+        GroupPermission = Group.permissions.through
+        current = set(
+            GroupPermission.objects.filter(group_id__in=groups.values()).values_list('group_id', 'permission_id')
+        )
+        desired = {
+            (groups[name], permission_ids[perm])
+            for name, role in spec.items()
+            for perm in role.get('permissions', ())
+        }
+
+        Membership = CustomUser.groups.through
+        managed = {name: role['users'] for name, role in spec.items() if 'users' in role}
+        current_members = set(
+            Membership.objects.filter(group_id__in=[groups[name] for name in managed])
+            .values_list('group_id', 'customuser_id')
+        )
+        desired_members = {
+            (groups[name], user_ids[user]) for name, users in managed.items() for user in users
+        }
+
+        changes = (
+            *_apply(GroupPermission, 'group_id', 'permission_id', current, desired),
+            *_apply(Membership, 'group_id', 'customuser_id', current_members, desired_members),
+        )
+        if dry_run:
+            # Report the changes without keeping them
+            transaction.set_rollback(True)
+        elif any(changes):
+            # Bulk writes skip m2m_changed, so invalidate cached permissions here
+            transaction.on_commit(bump_permissions_version)
+
+    return dict(zip(
+        ('permissions_added', 'permissions_removed', 'members_added', 'members_removed'), changes
+    ), groups_created=created)
@@ -0,0 +1,29 @@
+from django.contrib.auth.models import Group, Permission
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import bump_permissions_version
+from .models import CustomUser
+
+
+def _bump_on_commit():
+    transaction.on_commit(bump_permissions_version)
+
+
+# Group permissions, group memberships and direct user permissions
+@receiver(m2m_changed, sender=Group.permissions.through)
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+@receiver(m2m_changed, sender=CustomUser.user_permissions.through)
+def permissions_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _bump_on_commit()
+
+
+# Deleting a group or permission removes its rows without m2m_changed, and
+# new permissions widen what superusers hold
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def permission_rows_changed(sender, **kwargs):
+    _bump_on_commit()
@@ -1,3 +1,182 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Author, Book, CustomUser
+from .views import filter_books
+
+
+# The test runner is a single process, so its LocMemCache is shared enough
+@override_settings(BOOKSHELF_PERMISSION_CACHE_ALLOW_LOCAL=True)
+class PermissionCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(email='viewer@example.com', username='viewer', password='pass')
+        self.group = Group.objects.create(name='Viewers')
+        self.view_book = Permission.objects.get(codename='can_view_book')
+
+    def fresh_user(self):
+        # A new object per check, like request.user on every request
+        return CustomUser.objects.get(pk=self.user.pk)
+
+    def test_warm_checks_cost_no_queries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.permissions.add(self.view_book)
+            self.user.groups.add(self.group)
+        self.assertTrue(self.fresh_user().has_perm('bookshelf.can_view_book'))
+
+        user = self.fresh_user()
+        with CaptureQueriesContext(connection) as captured:
+            self.assertTrue(user.has_perm('bookshelf.can_view_book'))
+            self.assertFalse(user.has_perm('bookshelf.can_delete_book'))
+        self.assertEqual(len(captured), 0)
+
+    def test_group_and_permission_changes_invalidate(self):
+        self.assertFalse(self.fresh_user().has_perm('bookshelf.can_view_book'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.permissions.add(self.view_book)
+            self.user.groups.add(self.group)
+        self.assertTrue(self.fresh_user().has_perm('bookshelf.can_view_book'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.permissions.remove(self.view_book)
+        self.assertFalse(self.fresh_user().has_perm('bookshelf.can_view_book'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.user_permissions.add(self.view_book)
+        self.assertTrue(self.fresh_user().has_perm('bookshelf.can_view_book'))
+
+    @override_settings(BOOKSHELF_PERMISSION_CACHE_ALLOW_LOCAL=False)
+    def test_process_local_cache_is_not_trusted(self):
+        self.fresh_user().has_perm('bookshelf.can_view_book')
+        with CaptureQueriesContext(connection) as captured:
+            self.fresh_user().has_perm('bookshelf.can_view_book')
+        self.assertGreater(len(captured), 1)
+
+    def test_sessions_from_before_the_cached_backend_stay_signed_in(self):
+        self.client.force_login(self.user, backend='django.contrib.auth.backends.ModelBackend')
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 200)
+
+
+class SyncRolesTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            CustomUser.objects.create_user(email=f'user{i}@example.com', username=f'user{i}', password='pass')
+            for i in range(3)
+        ]
+
+    def sync(self, spec=None, **options):
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('sync_roles', *filter(None, [spec]), stdout=out, **options)
+        return out.getvalue()
+
+    def write_spec(self, spec):
+        path = os.path.join(tempfile.mkdtemp(), 'roles.json')
+        with open(path, 'w') as spec_file:
+            json.dump(spec, spec_file)
+        return path
+
+    def permissions(self, name):
+        return set(Group.objects.get(name=name).permissions.values_list('codename', flat=True))
+
+    def test_default_roles(self):
+        self.sync()
+        self.assertEqual(self.permissions('Viewers'), {'can_view_book', 'can_view_library'})
+        self.assertEqual(len(self.permissions('Admins')), 8)
+        self.assertIn('0 permissions added', self.sync())
+
+    def test_spec_diff_and_membership(self):
+        spec = {'Editors': {'permissions': ['bookshelf.can_view_book'], 'users': ['user0@example.com', 'user1@example.com']}}
+        self.sync(self.write_spec(spec))
+        self.assertTrue(self.users[0].has_perm('bookshelf.can_view_book'))
+
+        spec['Editors'] = {'permissions': ['bookshelf.can_edit_book'], 'users': ['user1@example.com', 'user2@example.com']}
+        path = self.write_spec(spec)
+        self.assertIn('Would apply', self.sync(path, dry_run=True))
+        self.assertEqual(self.permissions('Editors'), {'can_view_book'})
+
+        with CaptureQueriesContext(connection) as captured:
+            out = self.sync(path)
+        self.assertIn('1 permissions added, 1 removed, 1 members added, 1 removed', out)
+        self.assertLess(len(captured), 15)
+        self.assertEqual(self.permissions('Editors'), {'can_edit_book'})
+        members = Group.objects.get(name='Editors').user_set.values_list('username', flat=True)
+        self.assertEqual(sorted(members), ['user1', 'user2'])
+        # Bulk writes still invalidate the permission cache
+        self.assertFalse(CustomUser.objects.get(pk=self.users[0].pk).has_perm('bookshelf.can_view_book'))
+
+    def test_unknown_names_are_rejected(self):
+        with self.assertRaisesMessage(CommandError, 'bookshelf.can_fly'):
+            self.sync(self.write_spec({'Pilots': {'permissions': ['bookshelf.can_fly']}}))
+
+
+class BookExportTestCase(TestCase):
+    def setUp(self):
+        tolkien = Author.objects.create(name='Tolkien')
+        pratchett = Author.objects.create(name='Pratchett')
+        Book.objects.create(title='The Hobbit', isbn='9780261103344', author=tolkien)
+        Book.objects.create(title='Mort, "Discworld"', isbn='9780552131063', author=pratchett)
+        Book.objects.create(title='Silmarillion', author=tolkien)
+        # No model defines the bookshelf.can_view permission book_export requires, so only superusers pass
+        admin = CustomUser.objects.create_superuser(email='admin@example.com', username='admin', password='pass')
+        self.client.force_login(admin)
+
+    def export(self, export_format, **params):
+        response = self.client.get(reverse('book_export', args=[export_format]), params)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_honors_search_and_ordering(self):
+        lines = self.export('csv', search='tolkien', ordering='-title').splitlines()
+        self.assertEqual(lines[0], 'id,title,isbn,author')
+        self.assertEqual([line.split(',')[1] for line in lines[1:]], ['The Hobbit', 'Silmarillion'])
+        self.assertIn('"Mort, ""Discworld"""', self.export('csv'))
+
+    def test_ndjson_is_one_object_per_line(self):
+        rows = [json.loads(line) for line in self.export('ndjson', ordering='title').splitlines()]
+        self.assertEqual([row['author'] for row in rows], ['Pratchett', 'Tolkien', 'Tolkien'])
+        self.assertIsNone(rows[1]['isbn'])
+
+    def test_unknown_format_is_not_found(self):
+        self.assertEqual(self.client.get(reverse('book_export', args=['xml'])).status_code, 404)
+
+
+class FilterBooksTestCase(TestCase):
+    def setUp(self):
+        self.tolkien = Author.objects.create(name='Tolkien')
+        pratchett = Author.objects.create(name='Pratchett')
+        Book.objects.create(title='The Hobbit', author=self.tolkien)
+        Book.objects.create(title='Mort', author=pratchett)
+        Book.objects.create(title='Silmarillion', author=self.tolkien)
+
+    def titles(self, **params):
+        return [book.title for book in filter_books(RequestFactory().get('/books/', params))]
+
+    def test_search_matches_title_or_author(self):
+        self.assertEqual(self.titles(search='mort'), ['Mort'])
+        self.assertEqual(sorted(self.titles(search='TOLKIEN')), ['Silmarillion', 'The Hobbit'])
+
+    def test_author_and_ordering(self):
+        self.assertEqual(self.titles(author=self.tolkien.pk, ordering='-title'), ['The Hobbit', 'Silmarillion'])
+        self.assertEqual(self.titles(ordering='author__name')[0], 'Mort')
+        # A non-numeric author is ignored rather than failing
+        self.assertEqual(len(self.titles(author='tolkien')), 3)
+
+    def test_unknown_ordering_is_ignored(self):
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(len(self.titles(ordering='password')), 3)
+        self.assertEqual(len(captured), 1)
+        self.assertNotIn('password', captured[0]['sql'])
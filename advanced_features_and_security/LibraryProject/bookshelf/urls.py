@@ -8,6 +8,7 @@ urlpatterns = [
     path('profile/', views.profile, name='profile'),
     path('example_form/', views.example_form_view, name='example_form'),
     path('books/', views.book_list, name='book_list'),
+    path('books/export/<str:export_format>/', views.book_export, name='book_export'),
     path('books/add/', views.add_book, name='add_book'),
     path('books/edit/<int:book_id>/', views.edit_book, name='edit_book'),
     path('books/delete/<int:book_id>/', views.delete_book, name='delete_book'),
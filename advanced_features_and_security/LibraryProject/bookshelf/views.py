@@ -3,10 +3,21 @@ from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.forms import UserCreationForm
 from django.shortcuts import render, redirect
+from django.db.models import Q
 from .models import Author, Book
 from django.contrib import messages
+from .export import stream_export
 from .forms import ExampleForm
 
+# Columns written by book_export, mapped to their lookups
+BOOK_EXPORT_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'isbn': 'isbn',
+    'author': 'author__name',
+}
+BOOK_ORDERING_FIELDS = ['title', 'isbn', 'author__name']
+
 # Registration view
 def register(request):
     if request.method == 'POST':
@@ -46,12 +57,34 @@ def profile(request):
     return render(request, 'bookshelf/profile.html', {'user': request.user})
 
 
+# Books matching the ?search=, ?author= and ?ordering= query params
+def filter_books(request):
+    books = Book.objects.select_related('author')
+    search = request.GET.get('search')
+    if search:
+        books = books.filter(Q(title__icontains=search) | Q(author__name__icontains=search))
+    author = request.GET.get('author')
+    if author and author.isdigit():
+        books = books.filter(author_id=author)
+    ordering = request.GET.get('ordering', '')
+    if ordering.lstrip('-') in BOOK_ORDERING_FIELDS:
+        books = books.order_by(ordering, 'pk')
+    return books
+
+
 # View to list all books (requires view permission)
 @login_required
 @permission_required('bookshelf.can_view', raise_exception=True)
 def book_list(request):
-    books = Book.objects.all()
-    return render(request, 'book_list.html', {'books':books})
+    books = filter_books(request)
+    return render(request, 'bookshelf/book_list.html', {'books':books})
+
+
+# Stream the filtered books as CSV or NDJSON (requires view permission)
+@login_required
+@permission_required('bookshelf.can_view', raise_exception=True)
+def book_export(request, export_format):
+    return stream_export(filter_books(request), BOOK_EXPORT_FIELDS, export_format, filename='books')
 
 # View to add a new book (requires create permission)
 @login_required
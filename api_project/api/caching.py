@@ -0,0 +1,134 @@
+"""Response cache for the read actions of DRF views.
+
+``CachedResponseMixin`` caches the serialized data of ``list`` and
+``retrieve`` per URL and auth scope in the default cache (locmem, file or
+Redis). Every key embeds a version number for each model the view depends
+on; saving or deleting an instance of one of those models bumps its version
+once the transaction commits, so stale entries are never read again and
+simply expire. Models are registered with ``invalidate_on_change()`` from
+``AppConfig.ready()`` so writes from any process invalidate the cache.
+
+Versions only reach every worker through a shared cache such as Redis. With
+a process-local one (``LocMemCache``, the default) a write would leave the
+other workers serving stale responses, so caching is then skipped unless
+``RESPONSE_CACHE_ALLOW_LOCAL`` is set for a single-process setup.
+"""
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework.response import Response
+
+DEFAULT_TIMEOUT = 300
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def cache_is_shared():
+    """Whether cache versions are seen by every worker, which caching relies on."""
+    process_local = isinstance(caches['default'], (LocMemCache, DummyCache))
+    return not process_local or getattr(settings, 'RESPONSE_CACHE_ALLOW_LOCAL', False)
+
+
+def _version_key(model):
+    return f'respcache:version:{model._meta.label_lower}'
+
+
+def model_versions(models):
+    keys = [_version_key(model) for model in models]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    for key in missing:
+        # Seed from the clock so an evicted version never repeats an old one.
+        cache.add(key, time.time_ns(), None)
+    if missing:
+        found.update(cache.get_many(missing))
+    return [found.get(key) for key in keys]
+
+
+def bump_version(model):
+    try:
+        cache.incr(_version_key(model))
+    except ValueError:
+        cache.set(_version_key(model), time.time_ns(), None)
+
+
+def _bump_on_commit(sender, **kwargs):
+    transaction.on_commit(lambda: bump_version(sender))
+
+
+def invalidate_on_change(*models):
+    """Bump the cache version of ``models`` whenever one is saved or deleted."""
+    for model in models:
+        label = model._meta.label_lower
+        post_save.connect(_bump_on_commit, sender=model, dispatch_uid=f'respcache-save-{label}')
+        post_delete.connect(_bump_on_commit, sender=model, dispatch_uid=f'respcache-delete-{label}')
+
+
+def _record(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def cache_stats():
+    """Hit and miss counts for this process."""
+    with _stats_lock:
+        return {'hits': _stats['hit'], 'misses': _stats['miss']}
+
+
+class CachedResponseMixin:
+    # Models whose changes invalidate this view; defaults to the queryset model.
+    cache_models = ()
+    cache_timeout = DEFAULT_TIMEOUT
+    # Cache per user instead of per authenticated/anonymous scope when the
+    # response depends on who is asking.
+    cache_per_user = False
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response('list', super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response('retrieve', super().retrieve, request, *args, **kwargs)
+
+    def get_cache_scope(self, request):
+        if not request.user.is_authenticated:
+            return 'anon'
+        return f'user:{request.user.pk}' if self.cache_per_user else 'auth'
+
+    def get_response_cache_key(self, request, action):
+        models = self.cache_models or (self.queryset.model,)
+        raw = repr((
+            type(self).__module__,
+            type(self).__qualname__,
+            action,
+            self.get_cache_scope(request),
+            request.build_absolute_uri(),
+            model_versions(models),
+        ))
+        return 'respcache:' + hashlib.md5(raw.encode()).hexdigest()
+
+    def cached_response(self, action, handler, request, *args, **kwargs):
+        if not cache_is_shared():
+            return handler(request, *args, **kwargs)
+        key = self.get_response_cache_key(request, action)
+        data = cache.get(key)
+        if data is not None:
+            _record('hit')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        _record('miss')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.cache_timeout)
+        response['X-Cache'] = 'MISS'
+        return response
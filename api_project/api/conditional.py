@@ -0,0 +1,68 @@
+"""Conditional GET (``ETag`` / ``Last-Modified``) for the read actions of DRF views.
+
+The ``ETag`` is built without touching the database: it hashes the response
+cache versions of ``cache_models`` (which change on every save or delete of
+a model the payload depends on) together with the full request URI, so each
+page, cursor and filter has its own tag, the requesting user and the
+negotiated media type. ``Last-Modified`` is the time that ``ETag`` was first
+served, kept in the cache next to it. A request is only answered with ``304``
+when that record exists, i.e. a ``200`` has been served for exactly this
+state, so unknown objects still ``404`` and an evicted record costs a ``200``.
+Like the response cache, validators are only sent when ``cache_is_shared()``.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .caching import cache_is_shared, model_versions
+
+DEFAULT_TIMEOUT = 3600
+
+
+class ConditionalGetMixin:
+    # Models whose changes alter the payload; defaults to the queryset model.
+    cache_models = ()
+    validator_timeout = DEFAULT_TIMEOUT
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def get_etag(self, request):
+        models = self.cache_models or (self.queryset.model,)
+        raw = repr((
+            type(self).__module__,
+            type(self).__qualname__,
+            request.user.pk,
+            request.accepted_media_type,
+            request.build_absolute_uri(),
+            model_versions(models),
+        ))
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        if not cache_is_shared():
+            return handler(request, *args, **kwargs)
+        digest = self.get_etag(request)
+        etag = quote_etag(digest)
+        key = f'condget:{digest}'
+        last_modified = cache.get(key)
+        if last_modified is not None:
+            not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if not_modified is not None:
+                not_modified['ETag'] = etag
+                return not_modified
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            if last_modified is None:
+                last_modified = int(time.time())
+                cache.set(key, last_modified, self.validator_timeout)
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
@@ -0,0 +1,55 @@
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from api.models import Book
+
+BOOK_PREFIX = 'Book '
+USER_PREFIX = 'reader'
+
+
+def insert_missing(model, field, prefix, keys, build, batch_size):
+    """
+    Bulk-insert ``build(i, key)`` for every ``key`` in ``keys`` whose ``field``
+    value isn't in the table yet, so reruns only add what is missing.
+    Returns the number of rows actually inserted.
+    """
+    # One scan for the seeded rows; a lookup per batch would scan per batch
+    seeded = model.objects.filter(**{f'{field}__startswith': prefix})
+    existing = set(seeded.values_list(field, flat=True).iterator())
+    for start in range(0, len(keys), batch_size):
+        batch = [
+            build(i, key) for i, key in enumerate(keys[start:start + batch_size], start) if key not in existing
+        ]
+        model.objects.bulk_create(batch, ignore_conflicts=True)
+    # ignore_conflicts doesn't say which rows it skipped, so count what landed
+    return seeded.count() - len(existing)
+
+
+class Command(BaseCommand):
+    help = 'Seed a synthetic catalog of users and books of any size; safe to rerun.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=3)
+        parser.add_argument('--authors', type=int, default=10, help='Distinct author names to spread books over.')
+        parser.add_argument('--books', type=int, default=100)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--password', default='password123', help='Password of every seeded user.')
+
+    def handle(self, *args, users, authors, books, batch_size, password, **options):
+        authors = max(authors, 1)
+        # Hashing is deliberately slow, so every seeded user shares one hash
+        password = make_password(password)
+        usernames = [f'{USER_PREFIX}{i:04d}' for i in range(users)]
+        created_users = insert_missing(User, 'username', USER_PREFIX, usernames, lambda i, name: User(
+            username=name, email=f'{name}@example.com', password=password,
+        ), batch_size)
+
+        titles = [f'{BOOK_PREFIX}{i:07d}' for i in range(books)]
+        created_books = insert_missing(Book, 'title', BOOK_PREFIX, titles, lambda i, title: Book(
+            title=title,
+            author=f'Author {i % authors:06d}',
+            publication_year=1900 + i % 125,
+        ), batch_size)
+
+        self.stdout.write(self.style.SUCCESS(f'Created {created_users} users and {created_books} books.'))
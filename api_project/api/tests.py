@@ -1,3 +1,110 @@
-from django.test import TestCase
+from io import StringIO
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+from .authentication import local_tokens
+from .models import Book
 
-# Create your tests here.
+
+# The test runner is a single process, so its LocMemCache is shared enough
+@override_settings(RESPONSE_CACHE_ALLOW_LOCAL=True)
+class ResponseCacheTestCase(TestCase):
+    def setUp(self):
+        # Start from an empty cache so earlier tests can't produce hits
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username='reader', password='testpassword')
+        self.client.force_authenticate(self.user)
+        self.book = Book.objects.create(title='Cached', author='Author', publication_year=2020)
+
+    def test_book_list_is_cached_until_a_book_changes(self):
+        # The second read is served from the cache
+        self.assertEqual(self.client.get('/books/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/books/')['X-Cache'], 'HIT')
+
+        # Saving a book bumps the Book version once the transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(title='New Book', author='Author', publication_year=2021)
+        response = self.client.get('/books/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data), 2)
+
+    def test_unchanged_book_returns_304(self):
+        response = self.client.get(f'/books/{self.book.pk}/')
+        etag = response['ETag']
+        self.assertEqual(self.client.get(f'/books/{self.book.pk}/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Editing the book changes its ETag
+        self.book.title = 'Edited'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.save()
+        response = self.client.get(f'/books/{self.book.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Edited')
+
+
+class SeedCatalogTestCase(TestCase):
+    def seed(self, **options):
+        stdout = StringIO()
+        call_command('seed_catalog', stdout=stdout, **options)
+        return stdout.getvalue().strip()
+
+    def test_rerunning_only_adds_what_is_missing(self):
+        self.assertEqual(self.seed(users=2, authors=3, books=10, batch_size=4), 'Created 2 users and 10 books.')
+        output = self.seed(users=2, authors=3, books=12, batch_size=4)
+        self.assertEqual(output, 'Created 0 users and 2 books.')
+        self.assertEqual(get_user_model().objects.count(), 2)
+        self.assertEqual(Book.objects.count(), 12)
+        self.assertEqual(Book.objects.values('author').distinct().count(), 3)
+
+
+class CachedTokenAuthenticationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_tokens.clear()
+        self.user = get_user_model().objects.create_user(username='tokenholder', password='testpassword')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def token_queries(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/books/')
+        return response.status_code, sum('authtoken_token' in query['sql'] for query in captured)
+
+    def test_token_is_loaded_once(self):
+        self.assertEqual(self.token_queries(), (200, 1))
+        self.assertEqual(self.token_queries(), (200, 0))
+
+    def test_rotated_token_is_rejected(self):
+        self.token_queries()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+            Token.objects.create(user=self.user)
+        self.assertEqual(self.client.get('/books/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        self.token_queries()
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        response = self.client.get('/books/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data['detail'], 'User inactive or deleted.')
+
+    def test_unrelated_user_saves_keep_the_token_cached(self):
+        self.token_queries()
+        with CaptureQueriesContext(connection) as captured:
+            with self.captureOnCommitCallbacks(execute=True):
+                update_last_login(None, self.user)
+                self.user.first_name = 'Renamed'
+                self.user.save()
+        self.assertFalse(any('authtoken_token' in query['sql'] for query in captured))
+        self.assertEqual(self.token_queries(), (200, 0))
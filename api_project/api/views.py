@@ -1,3 +1,5 @@
+from .caching import CachedResponseMixin
+from .conditional import ConditionalGetMixin
 from .models import Book
 from rest_framework import viewsets
 from rest_framework import generics
@@ -9,13 +11,13 @@ class BookList(generics.ListAPIView):
     serializer_class = BookSerializer
 
 
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = super().get_queryset()
         author_filter = self.request.query_params.get('author', None)
         if author_filter is not None:
             queryset = queryset.filter(author__icontains=author_filter)    
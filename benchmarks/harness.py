@@ -0,0 +1,164 @@
+"""Benchmark one project in the current process.
+
+``benchmarks.run`` starts this module with the project directory as the
+working directory and ``DJANGO_SETTINGS_MODULE=benchmarks.settings``. It
+migrates a fresh database, seeds it through the scenario module of the same
+name under ``benchmarks.scenarios`` and writes the measurements as JSON.
+
+A scenario module defines ``seed(rows)`` and ``endpoints()``; the latter
+returns the ``Endpoint``s to drive once seeding is done.
+"""
+import argparse
+import importlib
+import json
+import math
+import statistics
+import time
+import tracemalloc
+from itertools import islice
+
+BATCH_SIZE = 2000
+
+
+class Endpoint:
+    """A GET request to benchmark, made as ``user`` if one is given.
+
+    ``token`` authenticates with a DRF token header instead of a session,
+    for the API projects that only enable ``TokenAuthentication``.
+    """
+
+    def __init__(self, name, path, user=None, token=False, params=None):
+        self.name = name
+        self.path = path
+        self.user = user
+        self.token = token
+        self.params = params or {}
+
+
+def bulk_seed(model, count, build, batch_size=BATCH_SIZE):
+    """``bulk_create`` ``build(i)`` for ``i`` in ``range(count)``, one batch in memory at a time."""
+    objects = (build(i) for i in range(count))
+    while batch := list(islice(objects, batch_size)):
+        model.objects.bulk_create(batch)
+
+
+def percentile(samples, q):
+    # Nearest-rank, so p99 of a small sample is its slowest request
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def make_client(endpoint):
+    from django.test import Client
+
+    client = Client(raise_request_exception=False)
+    if endpoint.user is not None and endpoint.token:
+        from rest_framework.settings import api_settings
+
+        # Issue the token through the project's own token model
+        authentication = next(
+            cls for cls in api_settings.DEFAULT_AUTHENTICATION_CLASSES if hasattr(cls, 'get_model')
+        )
+        token, _ = authentication().get_model().objects.get_or_create(user=endpoint.user)
+        client.defaults['HTTP_AUTHORIZATION'] = f'Token {token.key}'
+    elif endpoint.user is not None:
+        client.force_login(endpoint.user)
+    return client
+
+
+def fetch(client, endpoint):
+    response = client.get(endpoint.path, endpoint.params)
+    if response.streaming:
+        # Streaming responses do their work while being consumed
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def measure(endpoint, repeat, budget):
+    """Query counts, latency percentiles and peak memory of one endpoint.
+
+    The first request runs against an empty cache, the second shows what a
+    warm request costs. Timed requests stop early once ``budget`` seconds
+    are spent, so unpaginated endpoints on large datasets still finish.
+    """
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    client = make_client(endpoint)
+    cache.clear()
+    # Count right away: the query log is reset when the next request starts
+    with CaptureQueriesContext(connection) as captured:
+        response = fetch(client, endpoint)
+    queries_cold = len(captured)
+    with CaptureQueriesContext(connection) as captured:
+        fetch(client, endpoint)
+    queries_warm = len(captured)
+
+    tracemalloc.start()
+    fetch(client, endpoint)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings = []
+    deadline = time.perf_counter() + budget
+    while len(timings) < repeat and (not timings or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fetch(client, endpoint)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'path': endpoint.path,
+        'params': endpoint.params,
+        'status': response.status_code,
+        'queries_cold': queries_cold,
+        'queries_warm': queries_warm,
+        'samples': len(timings),
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'peak_memory_kib': peak // 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('scenario')
+    parser.add_argument('--rows', type=int, required=True)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--budget', type=float, default=30.0)
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+
+    import django
+    from django.core import signals
+    from django.core.management import call_command
+    from django.db import close_old_connections
+
+    django.setup()
+    # Keep one connection across requests, as the test runner does, so
+    # connecting isn't timed
+    signals.request_started.disconnect(close_old_connections)
+    signals.request_finished.disconnect(close_old_connections)
+    # --run-syncdb covers the apps that ship without migrations
+    call_command('migrate', run_syncdb=True, interactive=False, verbosity=0)
+    scenario = importlib.import_module(f'benchmarks.scenarios.{args.scenario}')
+
+    start = time.perf_counter()
+    scenario.seed(args.rows)
+    seed_seconds = time.perf_counter() - start
+
+    result = {
+        'seed_seconds': round(seed_seconds, 3),
+        'endpoints': {
+            endpoint.name: measure(endpoint, args.repeat, args.budget)
+            for endpoint in scenario.endpoints()
+        },
+    }
+    with open(args.output, 'w') as output:
+        json.dump(result, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
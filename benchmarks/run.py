@@ -0,0 +1,129 @@
+"""Benchmark the hot endpoints of every project in the repository.
+
+    python -m benchmarks.run --scale 1k --output before.json
+    python -m benchmarks.run --scale 1k --output after.json --compare before.json
+
+Each project runs in its own process: their settings and app labels clash,
+so they can't share one. A run migrates a throwaway SQLite database, seeds
+it at the chosen scale and drives the endpoints through the Django test
+client. For every endpoint the report records cold and warm query counts,
+p50/p99 latency and peak traced memory, together with the git commit, so
+reports from different commits can be compared.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCALES = {
+    '1k': 1_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+# scenario -> (project directory, settings module)
+PROJECTS = {
+    'social_media_api': ('social_media_api', 'social_media_api.settings'),
+    'django_blog': ('django_blog', 'django_blog.settings'),
+    'advanced_api_project': ('advanced-api-project', 'advanced_api_project.settings'),
+    'api_project': ('api_project', 'api_project.settings'),
+    'library_security': ('advanced_features_and_security/LibraryProject', 'LibraryProject.settings'),
+    'django_models': ('django-models', 'LibraryProject.settings'),
+    'introduction_to_django': ('Introduction_to_Django/LibraryProject', 'LibraryProject.settings'),
+}
+
+
+def git(*args):
+    try:
+        return subprocess.run(
+            ['git', *args], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_project(scenario, rows, repeat, budget, workdir):
+    directory, settings = PROJECTS[scenario]
+    output = os.path.join(workdir, f'{scenario}.json')
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE='benchmarks.settings',
+        BENCH_BASE_SETTINGS=settings,
+        BENCH_DB=os.path.join(workdir, f'{scenario}.sqlite3'),
+        PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])),
+    )
+    command = [
+        sys.executable, '-m', 'benchmarks.harness', scenario,
+        '--rows', str(rows), '--repeat', str(repeat), '--budget', str(budget), '--output', output,
+    ]
+    process = subprocess.run(command, cwd=os.path.join(ROOT, directory), env=env)
+    if process.returncode != 0:
+        return {'error': f'benchmark exited with status {process.returncode}'}
+    with open(output) as result:
+        return json.load(result)
+
+
+def compare(baseline, report):
+    """Print how each endpoint moved relative to ``baseline``."""
+    print(f"\n{'endpoint':<56} {'p50 ms':>21} {'p99 ms':>21} {'queries':>9}")
+    for scenario, result in report['projects'].items():
+        before = baseline.get('projects', {}).get(scenario, {}).get('endpoints', {})
+        for name, after in result.get('endpoints', {}).items():
+            old = before.get(name)
+            if old is None:
+                continue
+            label = f'{scenario}: {name}'[:56]
+            p50 = f"{old['p50_ms']:.1f} -> {after['p50_ms']:.1f}"
+            p99 = f"{old['p99_ms']:.1f} -> {after['p99_ms']:.1f}"
+            queries = f"{old['queries_warm']} -> {after['queries_warm']}"
+            print(f'{label:<56} {p50:>21} {p99:>21} {queries:>9}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=SCALES, default='1k', help='Rows in each main table.')
+    parser.add_argument('--projects', nargs='+', choices=PROJECTS, default=list(PROJECTS))
+    parser.add_argument('--repeat', type=int, default=50, help='Timed requests per endpoint.')
+    parser.add_argument(
+        '--budget', type=float, default=30.0, help='Seconds of timed requests per endpoint at most.'
+    )
+    parser.add_argument('--output', default='benchmark-report.json')
+    parser.add_argument('--compare', metavar='REPORT', help='Earlier report to compare against.')
+    args = parser.parse_args()
+
+    import django
+
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': git('rev-parse', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'scale': args.scale,
+        'rows': SCALES[args.scale],
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'projects': {},
+    }
+    with tempfile.TemporaryDirectory(prefix='benchmarks-') as workdir:
+        for scenario in args.projects:
+            print(f'Benchmarking {scenario} at {args.scale}...', file=sys.stderr)
+            report['projects'][scenario] = run_project(
+                scenario, SCALES[args.scale], args.repeat, args.budget, workdir
+            )
+
+    with open(args.output, 'w') as output:
+        json.dump(report, output, indent=2)
+    print(f'Wrote {args.output}', file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            compare(json.load(baseline), report)
+
+
+if __name__ == '__main__':
+    main()
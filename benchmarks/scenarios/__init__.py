@@ -0,0 +1 @@
+"""One module per project: ``seed(rows)`` and ``endpoints()``, see ``benchmarks.harness``."""
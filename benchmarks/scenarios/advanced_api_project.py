@@ -0,0 +1,22 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+
+from benchmarks.harness import Endpoint
+
+
+def seed(rows):
+    call_command('seed_catalog', books=rows, authors=max(rows // 10, 1), users=3, stdout=StringIO())
+
+
+def endpoints():
+    user = User.objects.get(username='reader0000')
+    # The router's routes come first in api.urls: books/ is served by
+    # BookViewSet and books/list/ by its detail route, so BookListView and
+    # ListView can't be reached
+    return [
+        Endpoint('BookViewSet list', '/books/', user=user, token=True),
+        Endpoint('AuthorViewSet list', '/authors/', user=user, token=True),
+        Endpoint('BookExportView (csv)', '/books/export/csv/', user=user, token=True),
+    ]
@@ -0,0 +1,17 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+
+from benchmarks.harness import Endpoint
+
+
+def seed(rows):
+    call_command('seed_catalog', books=rows, authors=max(rows // 10, 1), users=3, stdout=StringIO())
+
+
+def endpoints():
+    user = User.objects.get(username='reader0000')
+    return [
+        Endpoint('BookViewSet list', '/books/', user=user, token=True),
+    ]
@@ -0,0 +1,65 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from taggit.models import Tag, TaggedItem
+
+from blog.models import Comment, Post
+
+from benchmarks.harness import Endpoint, bulk_seed
+
+WORDS = (
+    'django python database query index cache template view model form '
+    'signal search tag comment feed api test deploy server client'
+).split()
+TAGS = 200
+TAGS_PER_POST = 3
+
+
+def seed(rows):
+    users = max(rows // 100, 10)
+    bulk_seed(User, users, lambda i: User(username=f'user{i:07d}', password='!'))
+    author_ids = list(User.objects.order_by('pk').values_list('pk', flat=True))
+
+    def post(i):
+        words = [WORDS[(i * 7 + k) % len(WORDS)] for k in range(40)]
+        return Post(
+            title=f'{WORDS[i % len(WORDS)].title()} notes {i}',
+            content=' '.join(words),
+            author_id=author_ids[i % len(author_ids)],
+            comment_count=1 if i < rows // 2 else 0,
+        )
+
+    bulk_seed(Post, rows, post)
+    first_post = Post.objects.order_by('pk').values_list('pk', flat=True).first()
+    bulk_seed(Comment, rows // 2, lambda i: Comment(
+        post_id=first_post + i, author_id=author_ids[i % len(author_ids)], content='Nice post',
+    ))
+
+    Tag.objects.bulk_create([Tag(name=f'topic-{i}', slug=f'topic-{i}') for i in range(TAGS)])
+    first_tag = Tag.objects.order_by('pk').values_list('pk', flat=True).first()
+    post_type = ContentType.objects.get_for_model(Post)
+    bulk_seed(TaggedItem, rows * TAGS_PER_POST, lambda i: TaggedItem(
+        content_type=post_type,
+        object_id=first_post + i // TAGS_PER_POST,
+        tag_id=first_tag + (i // TAGS_PER_POST + i % TAGS_PER_POST * 17) % TAGS,
+    ))
+
+    # Bulk inserts skip the signals that maintain these
+    call_command('rebuild_search_index', stdout=StringIO())
+    call_command('rebuild_tag_stats', stdout=StringIO())
+
+
+def endpoints():
+    user = User.objects.order_by('pk').first()
+    post = Post.objects.order_by('pk').first()
+    return [
+        Endpoint('PostListView', '/'),
+        Endpoint('PostListView (logged in)', '/', user=user),
+        Endpoint('PostDetailView', f'/post/{post.pk}/'),
+        Endpoint('PostByTagListView', '/tags/topic-1/'),
+        Endpoint('PostSearchView', '/search/', params={'q': 'django index'}),
+        Endpoint('post_comments', f'/post/{post.pk}/comments/'),
+        Endpoint('suggest', '/search/suggest/', params={'q': 'dja'}),
+    ]
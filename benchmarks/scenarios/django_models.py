@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+
+from bookshelf.models import Book
+
+from benchmarks.harness import Endpoint, bulk_seed
+
+ADMIN = 'admin'
+
+
+def seed(rows):
+    bulk_seed(Book, rows, lambda i: Book(
+        title=f'Book {i:07d}', author=f'Author {i % max(rows // 10, 1):06d}', publication_year=1900 + i % 125,
+    ))
+    get_user_model().objects.create_superuser(username=ADMIN, email='admin@example.com', password='benchmark')
+
+
+def endpoints():
+    # The project exposes no views of its own beyond the admin
+    admin = get_user_model().objects.get(username=ADMIN)
+    return [
+        Endpoint('admin book changelist', '/admin/bookshelf/book/', user=admin),
+        Endpoint('admin book search', '/admin/bookshelf/book/', user=admin, params={'q': 'Author 000001'}),
+    ]
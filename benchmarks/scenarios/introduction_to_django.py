@@ -0,0 +1,2 @@
+# Same bookshelf.Book model and admin as django-models
+from .django_models import endpoints, seed  # noqa: F401
@@ -0,0 +1,24 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from bookshelf.models import CustomUser
+
+from benchmarks.harness import Endpoint
+
+ADMIN_EMAIL = 'admin@example.com'
+
+
+def seed(rows):
+    call_command(
+        'seed_catalog', books=rows, authors=max(rows // 10, 1), users=3, libraries=10, stdout=StringIO()
+    )
+    CustomUser.objects.create_superuser(email=ADMIN_EMAIL, username='admin', password='benchmark')
+
+
+def endpoints():
+    admin = CustomUser.objects.get(email=ADMIN_EMAIL)
+    return [
+        Endpoint('book_list', '/books/', user=admin),
+        Endpoint('book_export (csv)', '/books/export/csv/', user=admin),
+    ]
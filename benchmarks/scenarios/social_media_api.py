@@ -0,0 +1,51 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import F
+
+from accounts.models import CustomUser, Follow
+from notifications.models import Notification
+from posts import timeline
+from posts.models import Comment, Post
+
+from benchmarks.harness import Endpoint, bulk_seed
+
+VIEWER = 'viewer'
+FOLLOWED = 50
+
+
+def seed(rows):
+    users = max(rows // 100, FOLLOWED)
+    CustomUser.objects.create_user(username=VIEWER, password='benchmark')
+    bulk_seed(CustomUser, users, lambda i: CustomUser(username=f'user{i:07d}', password='!'))
+    author_ids = list(CustomUser.objects.exclude(username=VIEWER).order_by('pk').values_list('pk', flat=True))
+    viewer = CustomUser.objects.get(username=VIEWER)
+
+    bulk_seed(Post, rows, lambda i: Post(
+        author_id=author_ids[i % len(author_ids)], title=f'Post {i}', content='Lorem ipsum ' * 20,
+    ))
+    first_post = Post.objects.order_by('pk').values_list('pk', flat=True).first()
+    bulk_seed(Comment, rows // 2, lambda i: Comment(
+        post_id=first_post + i % rows, author_id=author_ids[i % len(author_ids)], content='Nice post',
+    ))
+    Post.objects.filter(pk__lt=first_post + rows // 2).update(comment_count=F('comment_count') + 1)
+
+    # The viewer follows the first authors; their recent posts fill the timeline
+    followed = author_ids[:FOLLOWED]
+    Follow.objects.bulk_create([Follow(follower=viewer, followed_id=pk) for pk in followed])
+    CustomUser.objects.filter(pk=viewer.pk).update(following_count=len(followed))
+    CustomUser.objects.filter(pk__in=followed).update(followers_count=1)
+    timeline.backfill([viewer.pk], followed)
+
+    post_type = ContentType.objects.get_for_model(Post)
+    bulk_seed(Notification, max(rows // 10, 1), lambda i: Notification(
+        recipient=viewer, actor_id=author_ids[i % len(author_ids)], verb='liked your post',
+        content_type=post_type, object_id=first_post + i % rows,
+    ))
+
+
+def endpoints():
+    viewer = CustomUser.objects.get(username=VIEWER)
+    return [
+        Endpoint('feed', '/api/posts/feed/', user=viewer, token=True),
+        Endpoint('PostViewSet list', '/api/posts/posts/', user=viewer, token=True),
+        Endpoint('NotificationListView', '/api/notifications/', user=viewer, token=True),
+    ]
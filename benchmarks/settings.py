@@ -0,0 +1,37 @@
+"""Settings for a benchmark run: a project's own settings on local SQLite.
+
+``BENCH_BASE_SETTINGS`` names the project's settings module and ``BENCH_DB``
+the SQLite file to use; both are set by ``benchmarks.run``.
+"""
+import importlib
+import os
+
+_base = importlib.import_module(os.environ['BENCH_BASE_SETTINGS'])
+globals().update({name: value for name, value in vars(_base).items() if name.isupper()})
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['BENCH_DB'],
+    }
+}
+
+# Several projects read the key from the environment
+SECRET_KEY = globals().get('SECRET_KEY') or 'benchmarks-only-secret-key'
+
+# Measure production-like request handling: no debug pages or query log,
+# plain HTTP from the test client, and no collected static manifest
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+SECURE_SSL_REDIRECT = False
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# One process, so its local-memory cache is as shared as a Redis one
+RESPONSE_CACHE_ALLOW_LOCAL = True
+BOOKSHELF_PERMISSION_CACHE_ALLOW_LOCAL = True
+
+# Seeded users only need a cheap hash
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
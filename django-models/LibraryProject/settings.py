@@ -38,6 +38,15 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'bookshelf',
+    'relationship_app',
+]
+
+# Loads the user's profile (and role) with the session user. ModelBackend
+# stays listed so sessions created before it keep working; new logins are
+# recorded against the first backend that accepts them.
+AUTHENTICATION_BACKENDS = [
+    'relationship_app.roles.ProfileModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
 ]
 
 MIDDLEWARE = [
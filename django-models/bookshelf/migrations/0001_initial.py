@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2024-11-03 21:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Book',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('author', models.CharField(max_length=100)),
+                ('publication_year', models.IntegerField()),
+            ],
+        ),
+    ]
@@ -46,14 +46,30 @@ class UserProfile(models.Model):
     def __str__(self):
         return f'{self.user.username} - {self.role}'
 
+    # Remember the stored role so saving the user can tell if it changed
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        profile = super().from_db(db, field_names, values)
+        profile._loaded_role = profile.role
+        return profile
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_role = self.role
+
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         UserProfile.objects.create(user=instance)
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    instance.userprofile.save()
+def save_user_profile(sender, instance, created, **kwargs):
+    # Only write a profile that was loaded on this user and edited since;
+    # saves such as the last_login update on every login leave it alone
+    profile = instance._state.fields_cache.get('userprofile')
+    if created or profile is None or profile.role == getattr(profile, '_loaded_role', None):
+        return
+    profile.save(update_fields=['role'])
 
 "class Meta", "permissions"
 "can_add_book", "can_change_book", "can_delete_book"
\ No newline at end of file
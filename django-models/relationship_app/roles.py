@@ -0,0 +1,31 @@
+"""Role lookup for the role-restricted views.
+
+``ProfileModelBackend`` loads the session user together with its profile in
+one joined query, so ``check_role`` reads the role from memory instead of
+running a second query on every admin, librarian or member view. Roles
+are read fresh with the user on each request, so role changes apply on the
+next request without any cache to invalidate.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import ObjectDoesNotExist
+
+
+class ProfileModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related('userprofile').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+
+def get_role(user):
+    """The role of ``user``, or None for anonymous users and users without a profile."""
+    if not user.is_authenticated:
+        return None
+    try:
+        return user.userprofile.role
+    except ObjectDoesNotExist:
+        return None
@@ -1,3 +1,58 @@
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from .models import UserProfile
+
+
+class RoleViewTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='librarian', password='pass12345')
+        UserProfile.objects.filter(user=self.user).update(role='Librarian')
+        self.client.force_login(self.user)
+
+    def test_role_is_loaded_with_the_session_user(self):
+        self.client.get(reverse('librarian_view'))
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse('librarian_view'))
+        self.assertEqual(response.status_code, 200)
+        # The session and the user joined with its profile
+        self.assertEqual(len(captured), 2)
+        self.assertEqual(self.client.get(reverse('admin_view')).status_code, 302)
+
+    def test_role_changes_apply_on_the_next_request(self):
+        profile = UserProfile.objects.get(user=self.user)
+        profile.role = 'Admin'
+        profile.save()
+        self.assertEqual(self.client.get(reverse('admin_view')).status_code, 200)
+        self.assertEqual(self.client.get(reverse('librarian_view')).status_code, 302)
+
+    def test_sessions_from_before_the_profile_backend_stay_signed_in(self):
+        self.client.logout()
+        self.client.force_login(self.user, backend='django.contrib.auth.backends.ModelBackend')
+        self.assertEqual(self.client.get(reverse('librarian_view')).status_code, 200)
+
+    def test_new_logins_use_the_profile_backend(self):
+        self.client.logout()
+        self.assertTrue(self.client.login(username='librarian', password='pass12345'))
+        self.assertEqual(self.client.session['_auth_user_backend'], 'relationship_app.roles.ProfileModelBackend')
+
+
+class ProfileSaveTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='member', password='pass12345')
+
+    def test_login_does_not_write_the_profile(self):
+        user = User.objects.select_related('userprofile').get(pk=self.user.pk)
+        with CaptureQueriesContext(connection) as captured:
+            user.save(update_fields=['last_login'])
+        self.assertEqual(len(captured), 1)
+        self.assertTrue(self.client.login(username='member', password='pass12345'))
+
+    def test_edited_profile_is_saved_with_the_user(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.userprofile.role = 'Member'
+        user.save()
+        self.assertEqual(UserProfile.objects.get(user=user).role, 'Member')
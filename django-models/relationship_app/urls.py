@@ -9,7 +9,7 @@ urlpatterns = [
     path('admin-view/', views.admin_view, name='admin_view'),
     path('librarian-view/', views.librarian_view, name='librarian_view'),
     path('member-view/', views.member_view, name='member_view'),
-    "add_book/", "edit_book/", "delete_book"
+    # "add_book/", "edit_book/", "delete_book"
 ]
 
  
@@ -31,10 +31,12 @@ def user_logout(request):
 
 from django.contrib.auth.decorators import user_passes_test
 from django.shortcuts import render, HttpResponse
+from .roles import get_role
 
+# The profile is loaded with the session user (see roles.ProfileModelBackend)
 def check_role(role):
     def decorator(user):
-        return user.is_authenticated and user.userprofile.role == role
+        return get_role(user) == role
     return decorator
 
 @user_passes_test(check_role('Admin'))
@@ -0,0 +1,161 @@
+"""Search-as-you-type suggestions for post titles and tag names.
+
+The index is a sorted list of ``(key, kind, pk)`` entries held in process
+memory, where the keys are every word-start suffix of a title or tag name
+("django rest tips", "rest tips", "tips"). A prefix lookup is two
+``bisect`` calls, and the matches are ranked by popularity: comment count
+for posts, post count for tags. So a keystroke never touches the database.
+
+The index is built on first use and rebuilt in the background once it is
+older than ``BLOG_AUTOCOMPLETE_MAX_AGE`` seconds, which picks up changes
+made by other processes (see ``blog.inmemory``). Changes made in this
+process are patched in by ``blog.signals``.
+"""
+
+import heapq
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.urls import reverse
+from taggit.models import Tag
+
+from .inmemory import InMemoryIndex
+from .models import Post
+from .search import tokenize
+
+DEFAULT_LIMIT = 8
+DEFAULT_MAX_AGE = 300
+MAX_LIMIT = 20
+MIN_PREFIX = 2
+MEMO_SIZE = 10000
+BATCH_SIZE = 2000
+
+POST = "post"
+TAG = "tag"
+
+
+def max_age():
+    return getattr(settings, "BLOG_AUTOCOMPLETE_MAX_AGE", DEFAULT_MAX_AGE)
+
+
+def _keys(text):
+    words = tokenize(text)
+    return {" ".join(words[i:]) for i in range(len(words))}
+
+
+class PrefixIndex(InMemoryIndex):
+    def __init__(self):
+        super().__init__()
+        self._entries = []  # sorted (key, kind, pk)
+        self._items = {}  # (kind, pk) -> [text, slug, score, keys]
+        # prefix -> {limit: answer}. Short prefixes can match thousands of
+        # entries, so answers are kept until an entry under them changes.
+        self._memo = {}
+
+    def _add(self, kind, pk, text, score, slug=None):
+        keys = _keys(text)
+        self._items[(kind, pk)] = [text, slug, score, keys]
+        self._forget(keys)
+        for key in keys:
+            insort(self._entries, (key, kind, pk))
+
+    def _forget(self, keys):
+        for key in keys:
+            for end in range(MIN_PREFIX, len(key) + 1):
+                self._memo.pop(key[:end], None)
+
+    def _discard(self, kind, pk):
+        item = self._items.pop((kind, pk), None)
+        if item is None:
+            return
+        self._forget(item[3])
+        for key in item[3]:
+            index = bisect_left(self._entries, (key, kind, pk))
+            if index < len(self._entries) and self._entries[index] == (key, kind, pk):
+                del self._entries[index]
+
+    def _put(self, kind, pk, text, score, slug):
+        previous = self._items.get((kind, pk))
+        if score is None:
+            score = previous[2] if previous else 0
+        self._discard(kind, pk)
+        self._add(kind, pk, text, score, slug)
+
+    def _bump(self, kind, pks, delta):
+        for pk in pks:
+            item = self._items.get((kind, pk))
+            if item is not None:
+                item[2] = max(item[2] + delta, 0)
+                self._forget(item[3])
+
+    def max_age(self):
+        return max_age()
+
+    def load(self):
+        items, entries = {}, []
+        posts = Post.objects.values_list("pk", "title", "comment_count")
+        for pk, title, comments in posts.iterator(chunk_size=BATCH_SIZE):
+            keys = _keys(title)
+            items[(POST, pk)] = [title, None, comments, keys]
+            entries.extend((key, POST, pk) for key in keys)
+        tags = Tag.objects.values_list("pk", "name", "slug", "blog_stat__post_count")
+        for pk, name, slug, count in tags.iterator(chunk_size=BATCH_SIZE):
+            keys = _keys(name)
+            items[(TAG, pk)] = [name, slug, count or 0, keys]
+            entries.extend((key, TAG, pk) for key in keys)
+        entries.sort()
+        return items, entries
+
+    def install(self, fresh):
+        self._items, self._entries = fresh
+        self._memo = {}
+
+    def put(self, kind, pk, text, score=None, slug=None):
+        """Add or rename an entry, keeping its score unless one is given."""
+        self._change(self._put, kind, pk, text, score, slug)
+
+    def remove(self, kind, pk):
+        self._change(self._discard, kind, pk)
+
+    def bump(self, kind, pks, delta):
+        self._change(self._bump, kind, list(pks), delta)
+
+    def suggest(self, query, limit=DEFAULT_LIMIT):
+        prefix = " ".join(tokenize(query))
+        if len(prefix) < MIN_PREFIX:
+            return []
+        self.ensure_fresh()
+        with self._lock:
+            answers = self._memo.get(prefix, {})
+            if limit in answers:
+                return answers[limit]
+            start = bisect_left(self._entries, (prefix,))
+            end = bisect_left(self._entries, (prefix + "\uffff",))
+            items = self._items
+            ranked = {
+                (-items[kind, pk][2], len(items[kind, pk][0]), kind, pk)
+                for _, kind, pk in self._entries[start:end]
+            }
+            result = [
+                (kind, pk, *items[kind, pk][:3])
+                for _, _, kind, pk in heapq.nsmallest(limit, ranked)
+            ]
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo.setdefault(prefix, {})[limit] = result
+            return result
+
+
+index = PrefixIndex()
+
+
+def suggestions(query, limit=DEFAULT_LIMIT):
+    """Up to ``limit`` ``text``/``kind``/``url`` dicts, most popular first."""
+    results = []
+    for kind, pk, text, slug, _ in index.suggest(query, min(limit, MAX_LIMIT)):
+        if kind == POST:
+            url = reverse("post-detail", args=[pk])
+        else:
+            url = reverse("posts-by-tag", args=[slug])
+        results.append({"text": text, "kind": kind, "url": url})
+    return results
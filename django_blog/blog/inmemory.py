@@ -0,0 +1,99 @@
+"""Process-local indexes that rebuild themselves from the database.
+
+Signals only reach the process that made a change, so the in-memory search
+backend and the autocomplete index also rebuild once they are older than
+``max_age()`` seconds. ``InMemoryIndex`` holds what they share. The first
+use waits for a build, as there is nothing to serve yet. After that, a stale
+index starts a single rebuild in a background thread and keeps answering
+from the old one; with ``BLOG_INDEX_REBUILD_ASYNC = False`` that caller
+rebuilds inline instead. Changes made while a rebuild reads the database are
+queued and replayed onto the new index before it is swapped in.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+
+def rebuild_async():
+    return getattr(settings, "BLOG_INDEX_REBUILD_ASYNC", True)
+
+
+class InMemoryIndex:
+    def __init__(self):
+        self._lock = threading.Lock()  # guards the index and pending changes
+        self._rebuild_lock = threading.Lock()
+        self._built_at = None
+        self._pending = None  # changes made while a rebuild reads the database
+
+    def max_age(self):
+        raise NotImplementedError
+
+    def load(self):
+        """Read the database into a new index; runs without the lock."""
+        raise NotImplementedError
+
+    def install(self, fresh):
+        """Make ``fresh`` the current index; runs under the lock."""
+        raise NotImplementedError
+
+    def _change(self, apply, *args):
+        with self._lock:
+            # Until the first build there is nothing to patch.
+            if self._built_at is not None:
+                apply(*args)
+            if self._pending is not None:
+                self._pending.append((apply, args))
+
+    def _build(self):
+        with self._lock:
+            self._pending = []
+        try:
+            fresh = self.load()
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            self.install(fresh)
+            for apply, args in self._pending:
+                apply(*args)
+            self._pending = None
+            self._built_at = time.monotonic()
+
+    def rebuild(self):
+        with self._rebuild_lock:
+            self._build()
+
+    def _stale(self):
+        return time.monotonic() - self._built_at > self.max_age()
+
+    def _rebuild_in_background(self):
+        try:
+            self._build()
+        finally:
+            self._rebuild_lock.release()
+            # Connections are per thread; don't leak this one's.
+            connections.close_all()
+
+    def ensure_fresh(self):
+        if self._built_at is None:
+            with self._rebuild_lock:
+                if self._built_at is None:
+                    self._build()
+            return
+        if not self._stale() or not self._rebuild_lock.acquire(blocking=False):
+            return
+        if not self._stale():
+            # Rebuilt while we were checking
+            self._rebuild_lock.release()
+        elif rebuild_async():
+            name = f"{type(self).__name__}-rebuild"
+            threading.Thread(target=self._rebuild_in_background, name=name, daemon=True).start()
+        else:
+            try:
+                self._build()
+            finally:
+                self._rebuild_lock.release()
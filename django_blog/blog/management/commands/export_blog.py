@@ -0,0 +1,62 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+from django.db.models import Prefetch
+
+from blog.models import Comment, Post
+
+
+def post_record(post):
+    return {
+        "id": post.pk,
+        "title": post.title,
+        "content": post.content,
+        "published_date": post.published_date.isoformat(),
+        "author": post.author.username,
+        "tags": [tag.name for tag in post.tags.all()],
+        "comments": [
+            {
+                "author": comment.author.username,
+                "content": comment.content,
+                "created_at": comment.created_at.isoformat(),
+                "updated_at": comment.updated_at.isoformat(),
+            }
+            for comment in post.comments.all()
+        ],
+    }
+
+
+class Command(BaseCommand):
+    help = "Stream every post with its tags and comments as JSON lines (read back by import_blog)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", "-o", help="File to write; defaults to standard output.")
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000, help="Posts fetched from the database at a time."
+        )
+
+    def handle(self, *args, output, chunk_size, **options):
+        # Prefetches run per chunk, so memory is bounded by --chunk-size
+        posts = (
+            Post.objects.select_related("author")
+            .prefetch_related(
+                "tags",
+                Prefetch(
+                    "comments",
+                    queryset=Comment.objects.select_related("author").order_by("created_at", "id"),
+                ),
+            )
+            .order_by("pk")
+            .iterator(chunk_size=chunk_size)
+        )
+        stream = open(output, "w", encoding="utf-8") if output else sys.stdout
+        exported = 0
+        try:
+            for post in posts:
+                stream.write(json.dumps(post_record(post), ensure_ascii=False) + "\n")
+                exported += 1
+        finally:
+            if output:
+                stream.close()
+        self.stderr.write(self.style.SUCCESS(f"Exported {exported} posts."))
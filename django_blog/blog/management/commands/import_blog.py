@@ -0,0 +1,182 @@
+import json
+from collections import deque
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from taggit.models import Tag, TaggedItem
+
+from blog import tags
+from blog.caching import LIST_VERSION_KEY, bump_version
+from blog.models import Comment, ImportCheckpoint, Post
+from blog.search import get_backend
+
+
+def timestamp(value):
+    return (parse_datetime(value) if value else None) or timezone.now()
+
+
+def bulk_insert(model, objects, key):
+    """``bulk_create`` that leaves every object with its primary key.
+
+    Without RETURNING (MySQL) the new rows are read back in the same
+    transaction by the ``key`` fields, among rows above the highest pk seen
+    before the insert; objects sharing a key get their pks in insert order.
+    """
+    if connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(objects)
+    last_pk = model.objects.aggregate(last=Max("pk"))["last"] or 0
+    model.objects.bulk_create(objects)
+    lookup = {f"{field}__in": {getattr(obj, field) for obj in objects} for field in key}
+    rows = model.objects.filter(pk__gt=last_pk, **lookup).order_by("pk").values_list("pk", *key)
+    pks = {}
+    for pk, *values in rows:
+        pks.setdefault(tuple(values), deque()).append(pk)
+    for obj in objects:
+        found = pks.get(tuple(getattr(obj, field) for field in key))
+        if not found:
+            raise CommandError(f"Could not read back an inserted {model._meta.verbose_name}.")
+        obj.pk = found.popleft()
+        obj._state.adding = False
+    return objects
+
+
+class Command(BaseCommand):
+    help = "Import posts with their tags and comments from JSON lines written by export_blog."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="JSONL file, one post per line.")
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Posts inserted per transaction."
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="Name to record progress under in the database; rerun with the same name to resume.",
+        )
+
+    def handle(self, *args, path, batch_size, checkpoint, **options):
+        self.content_type = ContentType.objects.get_for_model(Post)
+        imported = 0
+        start = 0
+        if checkpoint:
+            start = ImportCheckpoint.objects.filter(name=checkpoint).values_list("offset", flat=True).first() or 0
+        with open(path, "rb") as source:
+            source.seek(start)
+            while True:
+                records = self.read_batch(source, batch_size)
+                if not records:
+                    break
+                with transaction.atomic():
+                    self.import_batch(records)
+                    # Committed with the batch, so a crash can't repeat or skip it
+                    if checkpoint:
+                        ImportCheckpoint.objects.update_or_create(
+                            name=checkpoint, defaults={"offset": source.tell()}
+                        )
+                imported += len(records)
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"{imported} posts imported")
+
+        # Bulk inserts skip the signals, so refresh what they would maintain
+        bump_version(LIST_VERSION_KEY)
+        self.stdout.write(self.style.SUCCESS(f"Imported {imported} posts."))
+
+    def read_batch(self, source, size):
+        records = []
+        while len(records) < size:
+            offset = source.tell()
+            line = source.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError as error:
+                raise CommandError(f"Invalid JSON at byte {offset}: {error}")
+        return records
+
+    def user_ids(self, records):
+        names = {record["author"] for record in records}
+        names.update(comment["author"] for record in records for comment in record.get("comments", ()))
+        ids = dict(User.objects.filter(username__in=names).values_list("username", "pk"))
+        missing = names - ids.keys()
+        if missing:
+            # Unknown authors become accounts that can't log in until reset
+            User.objects.bulk_create(
+                [User(username=name, password=make_password(None)) for name in missing],
+                ignore_conflicts=True,
+            )
+            ids = dict(User.objects.filter(username__in=names).values_list("username", "pk"))
+        return ids
+
+    def tag_ids(self, records):
+        names = {name for record in records for name in record.get("tags", ())}
+        ids = dict(Tag.objects.filter(name__in=names).values_list("name", "pk"))
+        missing = names - ids.keys()
+        if missing:
+            Tag.objects.bulk_create(
+                [Tag(name=name, slug=Tag().slugify(name)) for name in missing],
+                ignore_conflicts=True,
+            )
+            ids.update(Tag.objects.filter(name__in=missing).values_list("name", "pk"))
+            # Names whose slug was taken; taggit's save() picks a free one
+            for name in missing - ids.keys():
+                ids[name] = Tag.objects.get_or_create(name=name)[0].pk
+        return ids
+
+    def import_batch(self, records):
+        users = self.user_ids(records)
+        tag_ids = self.tag_ids(records)
+
+        posts = bulk_insert(
+            Post,
+            [
+                Post(
+                    title=record["title"],
+                    content=record["content"],
+                    author_id=users[record["author"]],
+                    published_date=timestamp(record.get("published_date")),
+                    comment_count=len(record.get("comments", ())),
+                )
+                for record in records
+            ],
+            key=("author_id", "title"),
+        )
+        # auto_now_add overrides dates in a bulk insert, so restore them afterwards
+        for post, record in zip(posts, records):
+            post.published_date = timestamp(record.get("published_date"))
+        Post.objects.bulk_update(posts, ["published_date"])
+
+        TaggedItem.objects.bulk_create(
+            [
+                TaggedItem(content_type=self.content_type, object_id=post.pk, tag_id=tag_ids[name])
+                for post, record in zip(posts, records)
+                for name in set(record.get("tags", ()))
+            ],
+            ignore_conflicts=True,
+        )
+        tags.add_posts([tag_ids[name] for name in record.get("tags", ())] for record in records)
+
+        comments, dates = [], []
+        for post, record in zip(posts, records):
+            for item in record.get("comments", ()):
+                created_at, updated_at = timestamp(item.get("created_at")), timestamp(item.get("updated_at"))
+                comments.append(Comment(
+                    post_id=post.pk, author_id=users[item["author"]], content=item["content"],
+                    created_at=created_at, updated_at=updated_at,
+                ))
+                dates.append((created_at, updated_at))
+        if comments:
+            # The posts are uncommitted, so every comment on them is from this batch
+            bulk_insert(Comment, comments, key=("post_id", "author_id"))
+            for comment, (created_at, updated_at) in zip(comments, dates):
+                comment.created_at, comment.updated_at = created_at, updated_at
+            Comment.objects.bulk_update(comments, ["created_at", "updated_at"])
+
+        get_backend().index(Post.objects.filter(pk__in=[post.pk for post in posts]).prefetch_related("tags"))
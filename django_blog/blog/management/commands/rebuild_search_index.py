@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import get_backend
+
+
+class Command(BaseCommand):
+    help = "Re-index every blog post in the configured search backend."
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        indexed = backend.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Indexed {indexed} posts with {type(backend).__name__}.")
+        )
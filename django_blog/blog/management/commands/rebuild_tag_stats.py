@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog import tags
+
+
+class Command(BaseCommand):
+    help = "Recompute the tag post counts and co-occurrence pairs from the tagged items."
+
+    def handle(self, *args, **options):
+        total = tags.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt statistics for {total} tags."))
@@ -0,0 +1,87 @@
+from itertools import islice
+
+from django.conf import settings
+from django.db import migrations
+
+SQLITE_TABLE = "blog_post_fts"
+POSTGRES_TABLE = "blog_post_search"
+BATCH_SIZE = 1000
+
+
+def documents(apps):
+    Post = apps.get_model("blog", "Post")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    TaggedItem = apps.get_model("taggit", "TaggedItem")
+
+    tags = {}
+    content_type = ContentType.objects.filter(app_label="blog", model="post").first()
+    if content_type is not None:
+        items = TaggedItem.objects.filter(content_type=content_type).values_list(
+            "object_id", "tag__name"
+        )
+        for object_id, name in items.iterator(chunk_size=BATCH_SIZE):
+            tags.setdefault(object_id, []).append(name)
+
+    rows = Post.objects.order_by("pk").values_list("pk", "title", "content")
+    for pk, title, content in rows.iterator(chunk_size=BATCH_SIZE):
+        yield pk, title, content, " ".join(tags.get(pk, ()))
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {SQLITE_TABLE} USING fts5("
+            "title, content, tags, tokenize = 'porter unicode61')"
+        )
+        insert = f"INSERT INTO {SQLITE_TABLE} (rowid, title, content, tags) VALUES (%s, %s, %s, %s)"
+        rows = documents(apps)
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE TABLE {POSTGRES_TABLE} ("
+            "post_id bigint PRIMARY KEY REFERENCES blog_post (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX blog_post_search_document_idx ON {POSTGRES_TABLE} USING GIN (document)"
+        )
+        insert = (
+            f"INSERT INTO {POSTGRES_TABLE} (post_id, document) VALUES (%s, "
+            "setweight(to_tsvector(%s::regconfig, %s), 'A') || "
+            "setweight(to_tsvector(%s::regconfig, %s), 'D') || "
+            "setweight(to_tsvector(%s::regconfig, %s), 'B'))"
+        )
+        # The same text search configuration the backend queries with
+        config = getattr(settings, "BLOG_SEARCH_CONFIG", "english")
+        rows = (
+            (pk, config, title, config, content, config, tags)
+            for pk, title, content, tags in documents(apps)
+        )
+    else:
+        # Other databases use the in-process index, built on first search.
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        while batch := list(islice(rows, BATCH_SIZE)):
+            cursor.executemany(insert, batch)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SQLITE_TABLE}")
+    elif vendor == "postgresql":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {POSTGRES_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0003_post_tags"),
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
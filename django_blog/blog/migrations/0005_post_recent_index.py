@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0004_post_search"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["-published_date", "-id"], name="post_recent_idx"),
+        ),
+    ]
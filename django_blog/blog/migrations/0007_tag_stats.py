@@ -0,0 +1,117 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:26
+
+from collections import Counter
+from itertools import groupby, permutations
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def populate_tag_stats(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    TaggedItem = apps.get_model("taggit", "TaggedItem")
+    TagStat = apps.get_model("blog", "TagStat")
+    TagPair = apps.get_model("blog", "TagPair")
+
+    content_type = ContentType.objects.filter(app_label="blog", model="post").first()
+    if content_type is None:
+        return
+    items = (
+        TaggedItem.objects.filter(content_type=content_type)
+        .order_by("object_id")
+        .values_list("object_id", "tag_id")
+    )
+    counts, pairs = Counter(), Counter()
+    for _, rows in groupby(items.iterator(chunk_size=BATCH_SIZE), key=lambda row: row[0]):
+        tag_ids = [tag_id for _, tag_id in rows]
+        counts.update(tag_ids)
+        pairs.update(permutations(tag_ids, 2))
+
+    TagStat.objects.bulk_create(
+        [TagStat(tag_id=pk, post_count=n) for pk, n in counts.items()],
+        batch_size=BATCH_SIZE,
+    )
+    TagPair.objects.bulk_create(
+        [TagPair(tag_id=a, related_id=b, post_count=n) for (a, b), n in pairs.items()],
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0006_comment_pages"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        (
+            "taggit",
+            "0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TagStat",
+            fields=[
+                (
+                    "tag",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="blog_stat",
+                        serialize=False,
+                        to="taggit.tag",
+                    ),
+                ),
+                ("post_count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["-post_count"], name="tagstat_popular_idx")
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="TagPair",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("post_count", models.PositiveIntegerField(default=0)),
+                (
+                    "related",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="taggit.tag",
+                    ),
+                ),
+                (
+                    "tag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="taggit.tag",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["tag", "-post_count"], name="tagpair_popular_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("tag", "related"), name="tagpair_unique"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_tag_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_tag_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('offset', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
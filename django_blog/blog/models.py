@@ -2,6 +2,7 @@ from django.contrib.auth.models import User
 from django.urls import reverse
 from django.db import models
 from taggit.managers import TaggableManager
+from taggit.models import Tag
 
 
 class Post(models.Model):
@@ -10,6 +11,13 @@ class Post(models.Model):
     published_date = models.DateTimeField(auto_now_add=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     tags = TaggableManager()  # Add the TaggableManager to the Post model
+    comment_count = models.PositiveIntegerField(default=0)  # Kept in step by blog.signals
+
+    class Meta:
+        indexes = [
+            # Serves the newest-first keyset pagination of the post lists
+            models.Index(fields=["-published_date", "-id"], name="post_recent_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -25,6 +33,12 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Serves the newest-first comment pages of a post
+            models.Index(fields=["post", "-created_at", "-id"], name="comment_post_recent_idx"),
+        ]
+
     def __str__(self):
         return f"Comment by {self.author} on {self.post.title}"
 
@@ -32,3 +46,48 @@ class Comment(models.Model):
         return reverse(
             "post-detail", kwargs={"pk": self.post.pk}
         )  # Redirect to the post detail page
+
+
+# Tag statistics, kept up to date by blog.signals (see blog.tags)
+class TagStat(models.Model):
+    tag = models.OneToOneField(
+        Tag, primary_key=True, related_name="blog_stat", on_delete=models.CASCADE
+    )
+    post_count = models.PositiveIntegerField(default=0)  # Posts carrying the tag
+
+    class Meta:
+        indexes = [models.Index(fields=["-post_count"], name="tagstat_popular_idx")]
+
+    def __str__(self):
+        return f"{self.tag}: {self.post_count}"
+
+
+class TagPair(models.Model):
+    # Stored in both directions so a tag's related tags are one index range
+    tag = models.ForeignKey(Tag, related_name="+", on_delete=models.CASCADE)
+    related = models.ForeignKey(Tag, related_name="+", on_delete=models.CASCADE)
+    post_count = models.PositiveIntegerField(default=0)  # Posts carrying both tags
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tag", "related"], name="tagpair_unique")
+        ]
+        indexes = [
+            models.Index(fields=["tag", "-post_count"], name="tagpair_popular_idx")
+        ]
+
+    def __str__(self):
+        return f"{self.tag} + {self.related}: {self.post_count}"
+
+
+class ImportCheckpoint(models.Model):
+    """How far ``manage.py import_blog --checkpoint`` got through its file.
+
+    Saved in the same transaction as each imported batch, so a resumed
+    import never repeats or skips one.
+    """
+    name = models.CharField(max_length=255, primary_key=True)
+    offset = models.BigIntegerField(default=0)  # Byte offset of the next record
+
+    def __str__(self):
+        return f"{self.name}: {self.offset}"
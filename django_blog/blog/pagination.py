@@ -0,0 +1,82 @@
+import base64
+import binascii
+from datetime import datetime
+from functools import cached_property
+
+from django.db.models import Q
+from django.http import Http404
+
+
+def older_than(position, pk, field):
+    """Rows strictly after ``(position, pk)`` in newest-first order."""
+    return Q(**{f"{field}__lt": position}) | Q(**{field: position, "pk__lt": pk})
+
+
+def encode_cursor(position, pk):
+    return base64.urlsafe_b64encode(f"{position.isoformat()}|{pk}".encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        position, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(position), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise Http404("Invalid cursor")
+
+
+def keyset_page(queryset, size, cursor=None, field="published_date"):
+    """Return one newest-first page of ``queryset`` and the cursor of the next."""
+    if cursor:
+        queryset = queryset.filter(older_than(*decode_cursor(cursor), field))
+    # Fetch one extra row to learn whether an older page exists
+    rows = list(queryset.order_by(f"-{field}", "-pk")[: size + 1])
+    page = rows[:size]
+    next_cursor = None
+    if len(rows) > size:
+        next_cursor = encode_cursor(getattr(page[-1], field), page[-1].pk)
+    return page, next_cursor
+
+
+class LazyKeysetPage:
+    """A ``keyset_page()`` that only queries once the template reads it.
+
+    Rendering from a cached ``{% cache %}`` fragment never touches it.
+    """
+
+    def __init__(self, queryset, size, cursor=None, field="published_date"):
+        self.args = queryset, size, cursor, field
+
+    @cached_property
+    def _page(self):
+        return keyset_page(*self.args)
+
+    @property
+    def items(self):
+        return self._page[0]
+
+    @property
+    def next_cursor(self):
+        return self._page[1]
+
+
+class KeysetPaginationMixin:
+    """"Older posts" pagination for list views, newest first.
+
+    Each page is one ``WHERE (position, id) < cursor ORDER BY ... LIMIT``
+    query, so page 1000 costs the same as page 1 and no ``COUNT(*)`` runs.
+    The template gets ``next_cursor`` to link to ``?before=<cursor>``.
+    """
+
+    paginate_by = 10
+    cursor_param = "before"
+    position_field = "published_date"
+
+    def paginate_queryset(self, queryset, page_size):
+        cursor = self.request.GET.get(self.cursor_param)
+        page, self.next_cursor = keyset_page(queryset, page_size, cursor, self.position_field)
+        return None, None, page, self.next_cursor is not None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["next_cursor"] = self.next_cursor
+        return context
@@ -0,0 +1,309 @@
+"""Full-text search over blog posts.
+
+``search_posts()`` returns post ids ranked by relevance from the configured
+backend. Each backend indexes a post's title, content and tag names, and is
+kept up to date by the signal handlers in ``blog.signals``:
+
+* ``SQLiteFTSBackend`` - an FTS5 table ranked with ``bm25()``.
+* ``PostgresBackend`` - a ``tsvector`` table with a GIN index, ranked with
+  ``ts_rank_cd()``.
+* ``InMemoryBackend`` - a BM25 inverted index held by the process, built
+  lazily from the database and rebuilt in the background once older than
+  ``BLOG_SEARCH_MAX_AGE`` seconds; the fallback for MySQL and anything else.
+
+The tables are created by migration ``0004_post_search``; run
+``manage.py rebuild_search_index`` to re-index from scratch.
+"""
+
+import math
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from .inmemory import InMemoryIndex
+from .models import Post
+
+DEFAULT_MAX_RESULTS = 100
+DEFAULT_MAX_AGE = 300
+BATCH_SIZE = 1000
+
+SQLITE_TABLE = "blog_post_fts"
+POSTGRES_TABLE = "blog_post_search"
+
+# Relative weight of a hit in each field.
+TITLE_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+TAGS_WEIGHT = 5.0
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def max_results():
+    return getattr(settings, "BLOG_SEARCH_MAX_RESULTS", DEFAULT_MAX_RESULTS)
+
+
+def max_age():
+    return getattr(settings, "BLOG_SEARCH_MAX_AGE", DEFAULT_MAX_AGE)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def document(post):
+    """The ``(id, title, content, tags)`` tuple indexed for ``post``."""
+    tags = " ".join(tag.name for tag in post.tags.all())
+    return post.pk, post.title, post.content, tags
+
+
+def _batches(queryset):
+    batch = []
+    for post in queryset.prefetch_related("tags").iterator(chunk_size=BATCH_SIZE):
+        batch.append(post)
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class SearchBackend:
+    def index(self, posts):
+        """Add or replace ``posts`` in the index."""
+        raise NotImplementedError
+
+    def remove(self, post_ids):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def search(self, query, limit):
+        """Return up to ``limit`` matching post ids, best match first."""
+        raise NotImplementedError
+
+    def rebuild(self):
+        self.clear()
+        indexed = 0
+        for batch in _batches(Post.objects.order_by("pk")):
+            self.index(batch)
+            indexed += len(batch)
+        return indexed
+
+
+class SQLiteFTSBackend(SearchBackend):
+    def index(self, posts):
+        rows = [document(post) for post in posts]
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [(row[0],) for row in rows]
+            )
+            cursor.executemany(
+                f"INSERT INTO {SQLITE_TABLE} (rowid, title, content, tags) VALUES (%s, %s, %s, %s)",
+                rows,
+            )
+
+    def remove(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [(pk,) for pk in post_ids]
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_TABLE}")
+
+    def search(self, query, limit):
+        # Quote every term so user input can't use FTS5 query syntax.
+        terms = " ".join(f'"{token}"' for token in tokenize(query))
+        if not terms:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s "
+                f"ORDER BY bm25({SQLITE_TABLE}, %s, %s, %s) LIMIT %s",
+                [terms, TITLE_WEIGHT, CONTENT_WEIGHT, TAGS_WEIGHT, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresBackend(SearchBackend):
+    def config(self):
+        return getattr(settings, "BLOG_SEARCH_CONFIG", "english")
+
+    def index(self, posts):
+        config = self.config()
+        # Title, tags and content map to tsvector weights A, B and D.
+        rows = [
+            (pk, config, title, config, tags, config, content)
+            for pk, title, content, tags in map(document, posts)
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {POSTGRES_TABLE} (post_id, document) VALUES (%s, "
+                "setweight(to_tsvector(%s::regconfig, %s), 'A') || "
+                "setweight(to_tsvector(%s::regconfig, %s), 'B') || "
+                "setweight(to_tsvector(%s::regconfig, %s), 'D')) "
+                "ON CONFLICT (post_id) DO UPDATE SET document = EXCLUDED.document",
+                rows,
+            )
+
+    def remove(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {POSTGRES_TABLE} WHERE post_id = ANY(%s)", [list(post_ids)]
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {POSTGRES_TABLE}")
+
+    def search(self, query, limit):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT post_id FROM {POSTGRES_TABLE}, plainto_tsquery(%s::regconfig, %s) query "
+                "WHERE document @@ query ORDER BY ts_rank_cd(document, query) DESC, post_id DESC "
+                "LIMIT %s",
+                [self.config(), query, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class BM25Index:
+    """A BM25 inverted index over ``document()`` rows."""
+
+    # BM25 parameters.
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self.postings = defaultdict(dict)  # token -> {post id: weighted frequency}
+        self.terms = {}  # post id -> tokens, so a post can be unindexed
+        self.lengths = {}  # post id -> weighted length
+        self.total_length = 0.0
+
+    def add(self, pk, title, content, tags):
+        self.discard(pk)
+        frequencies = defaultdict(float)
+        for text, weight in ((title, TITLE_WEIGHT), (content, CONTENT_WEIGHT), (tags, TAGS_WEIGHT)):
+            for token in tokenize(text):
+                frequencies[token] += weight
+        for token, frequency in frequencies.items():
+            self.postings[token][pk] = frequency
+        length = sum(frequencies.values())
+        self.terms[pk] = list(frequencies)
+        self.lengths[pk] = length
+        self.total_length += length
+
+    def discard(self, pk):
+        for token in self.terms.pop(pk, ()):
+            postings = self.postings[token]
+            postings.pop(pk, None)
+            if not postings:
+                del self.postings[token]
+        self.total_length -= self.lengths.pop(pk, 0.0)
+
+    def search(self, query, limit):
+        tokens = set(tokenize(query))
+        if not tokens or not self.lengths:
+            return []
+        postings = sorted((self.postings.get(token, {}) for token in tokens), key=len)
+        # Every term must match, as in the database backends.
+        matches = set(postings[0])
+        for posting in postings[1:]:
+            matches.intersection_update(posting)
+        if not matches:
+            return []
+
+        total = len(self.lengths)
+        average = self.total_length / total
+        scores = dict.fromkeys(matches, 0.0)
+        for posting in postings:
+            idf = math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+            for pk in matches:
+                frequency = posting[pk]
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[pk] / average)
+                scores[pk] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return sorted(matches, key=lambda pk: (-scores[pk], -pk))[:limit]
+
+
+class InMemoryBackend(InMemoryIndex, SearchBackend):
+    """A ``BM25Index`` held by the process, rebuilt as ``InMemoryIndex`` describes."""
+
+    def __init__(self):
+        super().__init__()
+        self._index = None
+
+    def max_age(self):
+        return max_age()
+
+    def load(self):
+        fresh = BM25Index()
+        for batch in _batches(Post.objects.order_by("pk")):
+            self._apply_to(fresh, map(document, batch), ())
+        return fresh
+
+    def install(self, fresh):
+        self._index = fresh
+
+    def _apply_to(self, index, rows, removed):
+        for row in rows:
+            index.add(*row)
+        for pk in removed:
+            index.discard(pk)
+
+    def _apply(self, rows, removed):
+        self._apply_to(self._index, rows, removed)
+
+    def index(self, posts):
+        self._change(self._apply, [document(post) for post in posts], ())
+
+    def remove(self, post_ids):
+        self._change(self._apply, (), list(post_ids))
+
+    def clear(self):
+        with self._lock:
+            self._index = BM25Index()
+
+    def rebuild(self):
+        super().rebuild()
+        return len(self._index.lengths)
+
+    def search(self, query, limit):
+        self.ensure_fresh()
+        with self._lock:
+            return self._index.search(query, limit)
+
+
+_backend = None
+
+
+def default_backend_path():
+    tables = connection.introspection.table_names()
+    if connection.vendor == "sqlite" and SQLITE_TABLE in tables:
+        return "blog.search.SQLiteFTSBackend"
+    if connection.vendor == "postgresql" and POSTGRES_TABLE in tables:
+        return "blog.search.PostgresBackend"
+    return "blog.search.InMemoryBackend"
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        path = getattr(settings, "BLOG_SEARCH_BACKEND", None) or default_backend_path()
+        _backend = import_string(path)()
+    return _backend
+
+
+def reindex(queryset):
+    """Re-index the posts in ``queryset`` a batch at a time."""
+    backend = get_backend()
+    for batch in _batches(queryset.order_by("pk")):
+        backend.index(batch)
+
+
+def search_posts(query, limit=None):
+    return get_backend().search(query, limit or max_results())
@@ -0,0 +1,140 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from taggit.models import Tag
+
+from . import autocomplete, tags
+from .caching import LIST_VERSION_KEY, bump_version, post_version_key
+from .models import Comment, Post
+from .search import get_backend, reindex
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, raw=False, **kwargs):
+    # Raw saves (fixtures, import_blog) are indexed by whoever makes them.
+    if raw:
+        return
+    transaction.on_commit(lambda: get_backend().index([instance]))
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: get_backend().remove([pk]))
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def reindex_post_tags(sender, instance, action, **kwargs):
+    # Tag names are part of the indexed document.
+    if action in ("post_add", "post_remove", "post_clear") and isinstance(instance, Post):
+        transaction.on_commit(lambda: get_backend().index([instance]))
+
+
+@receiver(post_save, sender=Tag)
+def reindex_renamed_tag(sender, instance, created, **kwargs):
+    # A saved tag may have been renamed, which changes every post using it.
+    if not created:
+        posts = Post.objects.filter(tags=instance)
+        transaction.on_commit(lambda: reindex(posts))
+
+
+def _invalidate_post(pk, listing=True):
+    def bump():
+        bump_version(post_version_key(pk))
+        if listing:
+            bump_version(LIST_VERSION_KEY)
+
+    transaction.on_commit(bump)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _invalidate_post(instance.pk)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_post_tags(sender, instance, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear") and isinstance(instance, Post):
+        _invalidate_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_thread(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Comments only appear on the post's own page
+    _invalidate_post(instance.post_id, listing=False)
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, raw=False, **kwargs):
+    # Raw rows arrive with their post's count already set
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(comment_count=F("comment_count") + 1)
+        _bump_post_popularity(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id).update(
+        comment_count=Greatest(F("comment_count") - 1, 0)
+    )
+    _bump_post_popularity(instance.post_id, -1)
+
+
+def _bump_post_popularity(post_id, delta):
+    transaction.on_commit(lambda: autocomplete.index.bump(autocomplete.POST, [post_id], delta))
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def count_post_tags(sender, instance, action, pk_set, **kwargs):
+    if not isinstance(instance, Post):
+        return
+    if action == "pre_clear":
+        instance._tag_ids_before_clear = list(instance.tags.values_list("pk", flat=True))
+    elif action == "post_clear":
+        tags.adjust(instance.__dict__.pop("_tag_ids_before_clear", ()), (), -1)
+    elif action in ("post_add", "post_remove") and pk_set:
+        current = instance.tags.values_list("pk", flat=True)
+        tags.adjust(pk_set, current, 1 if action == "post_add" else -1)
+
+
+@receiver(pre_delete, sender=Post)
+def uncount_deleted_post_tags(sender, instance, **kwargs):
+    # The tagged items go with the post, without an m2m_changed signal
+    tags.adjust(instance.tags.values_list("pk", flat=True), (), -1)
+
+
+# Autocomplete entries; popularity is patched where the counts change
+@receiver(post_save, sender=Post)
+def suggest_post(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    pk, title = instance.pk, instance.title
+    transaction.on_commit(lambda: autocomplete.index.put(autocomplete.POST, pk, title))
+
+
+@receiver(post_delete, sender=Post)
+def unsuggest_post(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: autocomplete.index.remove(autocomplete.POST, pk))
+
+
+@receiver(post_save, sender=Tag)
+def suggest_tag(sender, instance, **kwargs):
+    pk, name, slug = instance.pk, instance.name, instance.slug
+    transaction.on_commit(
+        lambda: autocomplete.index.put(autocomplete.TAG, pk, name, slug=slug)
+    )
+
+
+@receiver(post_delete, sender=Tag)
+def unsuggest_tag(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: autocomplete.index.remove(autocomplete.TAG, pk))
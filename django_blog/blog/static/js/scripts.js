@@ -1,4 +1,60 @@
 // Basic example script to demonstrate dynamic behavior
 document.addEventListener('DOMContentLoaded', function() {
     console.log('Blog page loaded');
-});
\ No newline at end of file
+
+    // Search-as-you-type: fill the search box's datalist on every keystroke
+    document.querySelectorAll('[data-suggest-url]').forEach(function(input) {
+        var list = document.getElementById(input.getAttribute('list'));
+        var latest = 0;
+        input.addEventListener('input', function() {
+            var request = ++latest;
+            fetch(input.dataset.suggestUrl + '?q=' + encodeURIComponent(input.value))
+                .then(function(response) { return response.json(); })
+                .then(function(data) {
+                    if (request !== latest) { return; }  // A newer keystroke won
+                    list.replaceChildren.apply(list, data.suggestions.map(function(suggestion) {
+                        var option = document.createElement('option');
+                        option.value = suggestion.text;
+                        return option;
+                    }));
+                });
+        });
+    });
+
+    // "Load more comments": fetch the next page of the thread as JSON
+    document.querySelectorAll('[data-load-comments]').forEach(function(button) {
+        button.addEventListener('click', function() {
+            var url = button.dataset.loadComments + '?before=' + encodeURIComponent(button.dataset.cursor);
+            var list = document.getElementById(button.dataset.target);
+            button.disabled = true;
+            fetch(url)
+                .then(function(response) { return response.json(); })
+                .then(function(page) {
+                    page.comments.forEach(function(comment) {
+                        var item = document.createElement('li');
+                        var author = document.createElement('strong');
+                        author.textContent = comment.author + ':';
+                        var date = document.createElement('small');
+                        date.textContent = new Date(comment.created_at).toLocaleString();
+                        item.append(author, ' ' + comment.content, document.createElement('br'), date);
+                        if (comment.update_url) {
+                            [['Edit', comment.update_url], ['Delete', comment.delete_url]].forEach(function(link) {
+                                var anchor = document.createElement('a');
+                                anchor.textContent = link[0];
+                                anchor.href = link[1];
+                                item.append(' ', anchor);
+                            });
+                        }
+                        list.appendChild(item);
+                    });
+                    if (page.next) {
+                        button.dataset.cursor = page.next;
+                        button.disabled = false;
+                    } else {
+                        button.remove();
+                    }
+                })
+                .catch(function() { button.disabled = false; });
+        });
+    });
+});
@@ -0,0 +1,225 @@
+"""Materialized tag statistics for the blog.
+
+``TagStat`` holds the number of posts per tag and ``TagPair`` how many posts
+share two tags. The handlers in ``blog.signals`` feed every tag
+add/remove/clear and post delete through ``adjust()``, and bulk imports
+count their posts with ``add_posts()``, so popularity, tag clouds and
+related-tag suggestions are index reads instead of ``GROUP BY`` over the
+tagged-items table. ``manage.py rebuild_tag_stats`` recomputes
+both tables from scratch.
+"""
+
+import math
+from collections import Counter
+from itertools import groupby, permutations
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from taggit.models import TaggedItem
+
+from . import autocomplete
+from .caching import bump_version, get_versions
+from .models import Post, TagPair, TagStat
+
+DEFAULT_CLOUD_SIZE = 30
+DEFAULT_RELATED_SIZE = 10
+DEFAULT_TIMEOUT = 600
+CLOUD_WEIGHTS = 5
+BATCH_SIZE = 1000
+
+VERSION_KEY = "blog:tags:version"
+
+
+def cloud_size():
+    return getattr(settings, "BLOG_TAG_CLOUD_SIZE", DEFAULT_CLOUD_SIZE)
+
+
+def cache_timeout():
+    return getattr(settings, "BLOG_TAG_CACHE_TIMEOUT", DEFAULT_TIMEOUT)
+
+
+def tags_version():
+    return get_versions([VERSION_KEY])[0]
+
+
+def adjust(changed, others, delta):
+    """Count ``changed`` tags ``delta`` more (or fewer) times on one post.
+
+    ``others`` are the post's tags that stay put; their pairings with the
+    changed tags move by ``delta`` too.
+    """
+    changed = set(changed)
+    others = set(others) - changed
+    if not changed:
+        return
+
+    if delta > 0:
+        TagStat.objects.bulk_create(
+            [TagStat(tag_id=pk) for pk in changed], ignore_conflicts=True
+        )
+        TagPair.objects.bulk_create(
+            [
+                TagPair(tag_id=a, related_id=b)
+                for a, b in permutations(changed | others, 2)
+                if a in changed or b in changed
+            ],
+            ignore_conflicts=True,
+        )
+
+    count = Greatest(F("post_count") + delta, 0)
+    TagStat.objects.filter(tag_id__in=changed).update(post_count=count)
+    TagPair.objects.filter(tag_id__in=changed, related_id__in=changed | others).update(
+        post_count=count
+    )
+    TagPair.objects.filter(tag_id__in=others, related_id__in=changed).update(
+        post_count=count
+    )
+    if delta < 0:
+        TagPair.objects.filter(tag_id__in=changed | others, post_count=0).delete()
+
+    def after_commit():
+        bump_version(VERSION_KEY)
+        autocomplete.index.bump(autocomplete.TAG, changed, delta)
+
+    transaction.on_commit(after_commit)
+
+
+def add_posts(tag_id_lists):
+    """Count a batch of new posts, each given by its tag ids, as ``adjust()`` would one by one.
+
+    Tags are grouped by how many of the posts use them, so a batch costs one
+    ``UPDATE`` per distinct count instead of one per post.
+    """
+    counts, pairs = Counter(), Counter()
+    for tag_ids in tag_id_lists:
+        tag_ids = set(tag_ids)
+        counts.update(tag_ids)
+        pairs.update(permutations(tag_ids, 2))
+    if not counts:
+        return
+
+    TagStat.objects.bulk_create(
+        [TagStat(tag_id=pk) for pk in counts], batch_size=BATCH_SIZE, ignore_conflicts=True
+    )
+    TagPair.objects.bulk_create(
+        [TagPair(tag_id=a, related_id=b) for a, b in pairs],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    by_count = {}
+    for pk, n in counts.items():
+        by_count.setdefault(n, []).append(pk)
+    for n, pks in by_count.items():
+        TagStat.objects.filter(tag_id__in=pks).update(post_count=F("post_count") + n)
+    by_tag_and_count = {}
+    for (a, b), n in pairs.items():
+        by_tag_and_count.setdefault((a, n), []).append(b)
+    for (a, n), related in by_tag_and_count.items():
+        TagPair.objects.filter(tag_id=a, related_id__in=related).update(post_count=F("post_count") + n)
+
+    def after_commit():
+        bump_version(VERSION_KEY)
+        for n, pks in by_count.items():
+            autocomplete.index.bump(autocomplete.TAG, pks, n)
+
+    transaction.on_commit(after_commit)
+
+
+def rebuild():
+    """Recompute both tables from the tagged items; return the number of tags."""
+    items = (
+        TaggedItem.objects.filter(content_type=ContentType.objects.get_for_model(Post))
+        .order_by("object_id")
+        .values_list("object_id", "tag_id")
+    )
+    counts, pairs = Counter(), Counter()
+    for _, rows in groupby(items.iterator(chunk_size=BATCH_SIZE), key=lambda row: row[0]):
+        tag_ids = [tag_id for _, tag_id in rows]
+        counts.update(tag_ids)
+        pairs.update(permutations(tag_ids, 2))
+
+    with transaction.atomic():
+        TagPair.objects.all().delete()
+        TagStat.objects.all().delete()
+        TagStat.objects.bulk_create(
+            [TagStat(tag_id=pk, post_count=n) for pk, n in counts.items()],
+            batch_size=BATCH_SIZE,
+        )
+        TagPair.objects.bulk_create(
+            [TagPair(tag_id=a, related_id=b, post_count=n) for (a, b), n in pairs.items()],
+            batch_size=BATCH_SIZE,
+        )
+        transaction.on_commit(lambda: bump_version(VERSION_KEY))
+    return len(counts)
+
+
+def _cached(key, compute):
+    key = f"{key}:{tags_version()}"
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, cache_timeout())
+    return value
+
+
+def tag_cloud(size=None):
+    """The most used tags as ``name``/``slug``/``count``/``weight`` dicts.
+
+    ``weight`` runs from 1 to ``CLOUD_WEIGHTS`` on a log scale of the count;
+    the cloud is sorted by name.
+    """
+    size = size or cloud_size()
+
+    def compute():
+        stats = list(
+            TagStat.objects.filter(post_count__gt=0)
+            .select_related("tag")
+            .order_by("-post_count", "tag__name")[:size]
+        )
+        if not stats:
+            return []
+        low = math.log(stats[-1].post_count)
+        spread = math.log(stats[0].post_count) - low or 1
+        return sorted(
+            (
+                {
+                    "name": stat.tag.name,
+                    "slug": stat.tag.slug,
+                    "count": stat.post_count,
+                    "weight": 1 + round((math.log(stat.post_count) - low) / spread * (CLOUD_WEIGHTS - 1)),
+                }
+                for stat in stats
+            ),
+            key=lambda entry: entry["name"].lower(),
+        )
+
+    return _cached(f"blog:tag-cloud:{size}", compute)
+
+
+def tag_post_count(tag):
+    def compute():
+        stat = TagStat.objects.filter(tag=tag).first()
+        return stat.post_count if stat else 0
+
+    return _cached(f"blog:tag-count:{tag.pk}", compute)
+
+
+def related_tags(tag, size=DEFAULT_RELATED_SIZE):
+    """Tags most often used together with ``tag``, most frequent first."""
+
+    def compute():
+        pairs = (
+            TagPair.objects.filter(tag=tag, post_count__gt=0)
+            .select_related("related")
+            .order_by("-post_count", "related__name")[:size]
+        )
+        return [
+            {"name": pair.related.name, "slug": pair.related.slug, "count": pair.post_count}
+            for pair in pairs
+        ]
+
+    return _cached(f"blog:related-tags:{tag.pk}:{size}", compute)
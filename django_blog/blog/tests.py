@@ -1,3 +1,416 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from taggit.models import Tag
+
+from . import autocomplete, search, tags
+from .caching import post_version_key
+from .models import Comment, ImportCheckpoint, Post, TagPair, TagStat
+
+
+class PostSearchTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        search._backend = None
+        self.author = User.objects.create_user(username="writer", password="pass12345")
+
+    def create_post(self, title, content, tags=()):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(title=title, content=content, author=self.author)
+            if tags:
+                post.tags.add(*tags)
+        return post
+
+    def assert_ranked_search(self):
+        body = self.create_post("Gardening basics", "Tomatoes need sun. Django is mentioned once.")
+        title = self.create_post("Django deployment", "Serving the app behind nginx.")
+        tagged = self.create_post("Weekend notes", "Nothing relevant here.", tags=["django"])
+        self.create_post("Cooking", "Pasta and sauce.")
+
+        self.assertEqual(search.search_posts("django"), [title.pk, tagged.pk, body.pk])
+        self.assertEqual(search.search_posts("django nginx"), [title.pk])
+        self.assertEqual(search.search_posts('" * OR'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            title.delete()
+            tagged.tags.clear()
+        self.assertEqual(search.search_posts("django"), [body.pk])
+
+    def test_sqlite_fts_backend(self):
+        self.assertIsInstance(search.get_backend(), search.SQLiteFTSBackend)
+        self.assert_ranked_search()
+
+    @override_settings(BLOG_SEARCH_BACKEND="blog.search.InMemoryBackend")
+    def test_in_memory_backend(self):
+        self.assert_ranked_search()
+
+    def test_renamed_tag_is_reindexed(self):
+        post = self.create_post("Weekend notes", "Nothing relevant here.", tags=["django"])
+        tag = Tag.objects.get(name="django")
+        tag.name = "flask"
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.save()
+        self.assertEqual(search.search_posts("flask"), [post.pk])
+        self.assertEqual(search.search_posts("django"), [])
+
+    @override_settings(
+        BLOG_SEARCH_BACKEND="blog.search.InMemoryBackend", BLOG_SEARCH_MAX_AGE=0, BLOG_INDEX_REBUILD_ASYNC=False
+    )
+    def test_in_memory_index_picks_up_other_processes(self):
+        self.create_post("Django deployment", "Serving the app behind nginx.")
+        self.assertEqual(len(search.search_posts("django")), 1)
+        # Written without signals, as another process would look from here
+        Post.objects.bulk_create([Post(title="Django testing", content="...", author=self.author)])
+        self.assertEqual(len(search.search_posts("django")), 2)
+
+    def test_search_view_lists_ranked_results(self):
+        first = self.create_post("Python tips", "python python")
+        second = self.create_post("Misc", "a little python")
+        response = self.client.get(reverse("post-search"), {"q": "python"})
+        self.assertEqual(list(response.context["posts"]), [first, second])
+
+
+class PostListPaginationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        author = User.objects.create_user(username="writer", password="pass12345")
+        self.posts = []
+        for i in range(25):
+            post = Post.objects.create(title=f"post {i}", content="...", author=author)
+            post.tags.add("django" if i % 2 else "python", "blog")
+            self.posts.append(post)
+
+    def walk(self, url):
+        # Logged in to bypass the page cache; the first request warms the
+        # tag cloud and tag statistics caches
+        self.client.force_login(User.objects.get(username="writer"))
+        self.client.get(url)
+        seen, queries = [], set()
+        while url:
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(url)
+            queries.add(len(captured))
+            seen.extend(post.pk for post in response.context["posts"])
+            cursor = response.context["next_cursor"]
+            url = f"{response.wsgi_request.path}?before={cursor}" if cursor else None
+        return seen, queries
+
+    def test_older_posts_pages_cover_every_post_in_constant_queries(self):
+        seen, queries = self.walk(reverse("post-list"))
+        self.assertEqual(seen, [post.pk for post in reversed(self.posts)])
+        self.assertEqual(len(queries), 1)
+
+    def test_tag_listing_pages_only_tagged_posts(self):
+        seen, queries = self.walk(reverse("posts-by-tag", args=["django"]))
+        self.assertEqual(seen, [post.pk for post in reversed(self.posts) if int(post.title.split()[1]) % 2])
+        self.assertEqual(len(queries), 1)
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(reverse("posts-by-tag", args=["django"]))
+        # Only the per-page tags prefetch may use DISTINCT, never the post query
+        post_query = next(q["sql"] for q in captured if 'FROM "blog_post"' in q["sql"])
+        self.assertNotIn("DISTINCT", post_query)
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get(reverse("post-list"), {"before": "nonsense"})
+        self.assertEqual(response.status_code, 404)
+
+
+class PageCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="writer", password="pass12345")
+        self.post = Post.objects.create(title="Viral", content="...", author=self.author)
+        self.url = reverse("post-detail", args=[self.post.pk])
+
+    def test_anonymous_detail_page_is_served_from_cache(self):
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "MISS")
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(len(captured), 0)
+        self.assertContains(response, "Viral")
+
+    def test_new_comment_invalidates_page_and_thread(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.comments.create(author=self.author, content="First!")
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertContains(response, "First!")
+
+    def test_logged_in_readers_get_fragments_but_not_cached_pages(self):
+        self.client.force_login(self.author)
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(self.url)
+        self.assertNotIn("X-Cache", response)
+        self.assertContains(response, "Edit")
+        # The comment thread is rendered from the cached fragment
+        self.assertFalse(any("blog_comment" in query["sql"] for query in captured))
+
+    @override_settings(BLOG_VERSION_CACHE_TIMEOUT=60)
+    def test_versions_of_missing_posts_expire(self):
+        self.assertEqual(self.client.get(reverse("post-detail", args=[999999])).status_code, 404)
+        self.assertIsNotNone(cache.get(post_version_key(999999)))
+        later = time.time() + 61
+        with mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            self.assertIsNone(cache.get(post_version_key(999999)))
+
+    def test_editing_a_post_invalidates_the_list(self):
+        list_url = reverse("post-list")
+        self.client.get(list_url)
+        self.post.title = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.save()
+        self.assertContains(self.client.get(list_url), "Renamed")
+
+
+class CommentThreadTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="writer", password="pass12345")
+        self.post = Post.objects.create(title="Busy", content="...", author=self.author)
+        self.comments = [
+            Comment.objects.create(post=self.post, author=self.author, content=f"comment {i}")
+            for i in range(45)
+        ]
+
+    def test_detail_renders_first_page_with_cached_count(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse("post-detail", args=[self.post.pk]))
+        self.assertContains(response, "Comments (45)")
+        self.assertContains(response, "comment 44")
+        self.assertNotContains(response, "comment 24")
+        self.assertContains(response, "Load more comments")
+        # The post with its author, one page of comments and the tags
+        self.assertEqual(len(captured), 3)
+
+    def test_load_more_walks_the_whole_thread(self):
+        self.client.force_login(self.author)
+        url = reverse("post-comments", args=[self.post.pk])
+        seen, cursor = [], None
+        while True:
+            page = self.client.get(url, {"before": cursor} if cursor else {}).json()
+            seen.extend(comment["id"] for comment in page["comments"])
+            self.assertIn("update_url", page["comments"][0])
+            cursor = page["next"]
+            if not cursor:
+                break
+        self.assertEqual(seen, [comment.pk for comment in reversed(self.comments)])
+
+    def test_comment_count_follows_deletes(self):
+        self.comments[0].delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 44)
+
+
+class TagStatsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="writer", password="pass12345")
+
+    def create_post(self, *tag_names):
+        post = Post.objects.create(title="tagged", content="...", author=self.author)
+        post.tags.add(*tag_names)
+        return post
+
+    def stats(self):
+        counts = {stat.tag.name: stat.post_count for stat in TagStat.objects.select_related("tag")}
+        pairs = {
+            (pair.tag.name, pair.related.name): pair.post_count
+            for pair in TagPair.objects.select_related("tag", "related")
+        }
+        return {name: n for name, n in counts.items() if n}, pairs
+
+    def test_incremental_stats_match_a_rebuild(self):
+        first = self.create_post("django", "python")
+        second = self.create_post("django", "web")
+        third = self.create_post("python")
+        first.tags.add("web")
+        second.tags.remove("web")
+        third.tags.clear()
+        self.create_post("django", "python").delete()
+
+        counts, pairs = self.stats()
+        self.assertEqual(counts, {"django": 2, "python": 1, "web": 1})
+        self.assertEqual(pairs[("django", "python")], 1)
+        self.assertEqual(pairs[("web", "django")], 1)
+
+        tags.rebuild()
+        self.assertEqual(self.stats(), (counts, pairs))
+
+    def test_related_tags_and_cloud(self):
+        for _ in range(4):
+            self.create_post("django", "python")
+        self.create_post("django", "web")
+
+        django = Tag.objects.get(name="django")
+        self.assertEqual(
+            [entry["name"] for entry in tags.related_tags(django)], ["python", "web"]
+        )
+        cloud = {entry["name"]: entry for entry in tags.tag_cloud()}
+        self.assertEqual(cloud["django"]["count"], 5)
+        self.assertEqual((cloud["django"]["weight"], cloud["web"]["weight"]), (5, 1))
+
+        with CaptureQueriesContext(connection) as captured:
+            tags.tag_cloud()
+        self.assertEqual(len(captured), 0)
+
+    def test_tag_page_shows_count_and_related_tags(self):
+        self.create_post("django", "python")
+        response = self.client.get(reverse("posts-by-tag", args=["django"]))
+        self.assertContains(response, 'Posts tagged "django" (1)')
+        self.assertEqual(response.context["related_tags"][0]["name"], "python")
+
+
+class AutocompleteTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        autocomplete.index = autocomplete.PrefixIndex()
+        self.author = User.objects.create_user(username="writer", password="pass12345")
+        self.quiet = Post.objects.create(title="Django signals in depth", content="...", author=self.author)
+        self.busy = Post.objects.create(title="Deploying Django", content="...", author=self.author)
+        for _ in range(3):
+            Comment.objects.create(post=self.busy, author=self.author, content="...")
+        self.busy.tags.add("django-rest")
+
+    def suggest(self, q):
+        response = self.client.get(reverse("post-suggest"), {"q": q})
+        return [(s["kind"], s["text"]) for s in response.json()["suggestions"]]
+
+    def test_prefixes_match_word_starts_ranked_by_popularity(self):
+        self.assertEqual(
+            self.suggest("djan"),
+            [("post", "Deploying Django"), ("tag", "django-rest"), ("post", "Django signals in depth")],
+        )
+        self.assertEqual(self.suggest("sig"), [("post", "Django signals in depth")])
+        self.assertEqual(self.suggest("d"), [])
+
+    def test_suggestions_do_not_touch_the_database_once_built(self):
+        self.suggest("djan")
+        with CaptureQueriesContext(connection) as captured:
+            self.suggest("deplo")
+        self.assertEqual(len(captured), 0)
+
+    def test_changes_are_patched_in(self):
+        self.suggest("djan")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.quiet.title = "Celery signals"
+            self.quiet.save()
+            for _ in range(5):
+                Comment.objects.create(post=self.quiet, author=self.author, content="...")
+            Post.objects.create(title="Django admin", content="...", author=self.author)
+        self.assertEqual(self.suggest("signals"), [("post", "Celery signals")])
+        self.assertEqual(self.suggest("celery")[0], ("post", "Celery signals"))
+        self.assertEqual(
+            self.suggest("djan"),
+            [("post", "Deploying Django"), ("tag", "django-rest"), ("post", "Django admin")],
+        )
+
+    @override_settings(BLOG_AUTOCOMPLETE_MAX_AGE=0, BLOG_INDEX_REBUILD_ASYNC=False)
+    def test_stale_index_is_served_while_another_caller_rebuilds(self):
+        self.suggest("djan")
+        Post.objects.bulk_create([Post(title="Django admin", content="...", author=self.author)])
+        with autocomplete.index._rebuild_lock:
+            with CaptureQueriesContext(connection) as captured:
+                self.assertEqual(len(self.suggest("djan")), 3)
+            self.assertEqual(len(captured), 0)
+        self.assertEqual(len(self.suggest("djan")), 4)
+
+    @override_settings(BLOG_AUTOCOMPLETE_MAX_AGE=0)
+    def test_stale_index_is_rebuilt_off_the_request(self):
+        self.suggest("djan")
+        with mock.patch("blog.inmemory.threading.Thread") as thread:
+            with CaptureQueriesContext(connection) as captured:
+                self.assertEqual(len(self.suggest("djan")), 3)
+        self.assertEqual(len(captured), 0)
+        thread.return_value.start.assert_called_once_with()
+        # The worker owns the rebuild until it finishes
+        self.assertTrue(autocomplete.index._rebuild_lock.locked())
+        autocomplete.index._rebuild_lock.release()
+
+
+class ImportExportTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        author = User.objects.create_user(username="writer", password="pass12345")
+        reader = User.objects.create_user(username="reader", password="pass12345")
+        for i in range(5):
+            post = Post.objects.create(title=f"Post {i}", content=f"Body {i}", author=author)
+            post.tags.add("django", f"topic-{i}")
+            Comment.objects.create(post=post, author=reader, content=f"Comment {i}")
+        self.path = os.path.join(tempfile.mkdtemp(), "blog.jsonl")
+        call_command("export_blog", output=self.path, chunk_size=2, stderr=StringIO())
+
+    def records(self):
+        with open(self.path) as dump:
+            return [json.loads(line) for line in dump]
+
+    def reset(self):
+        Post.objects.all().delete()
+        User.objects.all().delete()
+        Tag.objects.all().delete()
+
+    def test_round_trip(self):
+        exported = self.records()
+        self.assertEqual(len(exported), 5)
+        self.reset()
+
+        call_command("import_blog", self.path, batch_size=2, stdout=StringIO())
+
+        posts = Post.objects.order_by("published_date", "pk")
+        self.assertEqual([post.title for post in posts], [r["title"] for r in exported])
+        first = posts[0]
+        self.assertEqual(first.published_date.isoformat(), exported[0]["published_date"])
+        self.assertEqual(sorted(first.tags.names()), ["django", "topic-0"])
+        self.assertEqual(first.comment_count, 1)
+        self.assertEqual(first.comments.get().author.username, "reader")
+        self.assertEqual(TagStat.objects.get(tag__name="django").post_count, 5)
+        counted = set(TagPair.objects.values_list("tag_id", "related_id", "post_count"))
+        tags.rebuild()
+        self.assertEqual(set(TagPair.objects.values_list("tag_id", "related_id", "post_count")), counted)
+        self.assertEqual(search.search_posts("Body 3")[:1], [posts.get(title="Post 3").pk])
+
+    def test_checkpoint_resumes_without_duplicates(self):
+        self.reset()
+        with open(self.path, "rb") as dump:
+            dump.readline()
+            dump.readline()
+            # As if a previous run committed the first batch and stopped
+            ImportCheckpoint.objects.create(name="nightly", offset=dump.tell())
+
+        call_command("import_blog", self.path, checkpoint="nightly", stdout=StringIO())
+        call_command("import_blog", self.path, checkpoint="nightly", stdout=StringIO())
+        self.assertEqual(
+            sorted(Post.objects.values_list("title", flat=True)), ["Post 2", "Post 3", "Post 4"]
+        )
+
+    def test_bulk_insert_without_returning(self):
+        self.reset()
+        # As on MySQL, which can't return the ids of a bulk insert
+        features = type(connection.features)
+        with mock.patch.object(features, "can_return_rows_from_bulk_insert", new=False):
+            with CaptureQueriesContext(connection) as captured:
+                call_command("import_blog", self.path, batch_size=2, stdout=StringIO())
+        inserts = [q for q in captured if q["sql"].startswith('INSERT INTO "blog_post"')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(TagStat.objects.get(tag__name="django").post_count, 5)
+
+        for post in Post.objects.prefetch_related("comments", "tags"):
+            number = post.title.split()[-1]
+            self.assertEqual([c.content for c in post.comments.all()], [f"Comment {number}"])
+            self.assertEqual(sorted(post.tags.names()), ["django", f"topic-{number}"])
+            self.assertEqual(post.comment_count, 1)
@@ -9,7 +9,7 @@ from .views import (
     PostDeleteView,
 )
 from .views import CommentCreateView, CommentUpdateView, CommentDeleteView
-from .views import PostSearchView, PostByTagListView
+from .views import PostSearchView, PostByTagListView, post_comments, suggest
 
 urlpatterns = [
     path("", PostListView.as_view(), name="post-list"),
@@ -25,6 +25,7 @@ urlpatterns = [
     ),
     path("logout", auth_views.LogoutView.as_view(), name="logout"),
     path("profile/", profile, name="profile"),
+    path("post/<int:pk>/comments/", post_comments, name="post-comments"),
     # Fixing the path to match the expected URL pattern
     path(
         "post/<int:pk>/comments/new/",
@@ -38,5 +39,6 @@ urlpatterns = [
         "comment/<int:pk>/delete/", CommentDeleteView.as_view(), name="comment-delete"
     ),
     path("search/", PostSearchView.as_view(), name="post-search"),
+    path("search/suggest/", suggest, name="post-suggest"),
     path("tags/<slug:tag_slug>/", PostByTagListView.as_view(), name="posts-by-tag"),
 ]
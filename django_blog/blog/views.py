@@ -5,15 +5,21 @@ from django.views.generic import (
     UpdateView,
     DeleteView,
 )
+from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from .forms import CustomUserCreationForm, UserUpdateForm, CommentForm
 from django.urls import reverse, reverse_lazy
+from .caching import AnonymousPageCacheMixin, attach_versions, post_versions
 from .models import Comment, Post
-from django.db.models import Q
-from taggit.models import Tag
+from .pagination import KeysetPaginationMixin, LazyKeysetPage, keyset_page
+from .autocomplete import suggestions
+from .search import search_posts
+from .tags import related_tags, tag_cloud, tag_post_count
+from taggit.models import Tag, TaggedItem
 
 
 # User-related views
@@ -42,21 +48,70 @@ def profile(request):
 
 
 # Post views
-class PostListView(DjangoListView):
+COMMENT_PAGE_SIZE = 20  # Comments rendered with the post and per "load more"
+
+
+def post_comments_queryset(post_id):
+    return Comment.objects.filter(post_id=post_id).select_related("author")
+
+
+def post_comments(request, pk):
+    """JSON page of a post's comments older than the ``before`` cursor."""
+    get_object_or_404(Post.objects.only("pk"), pk=pk)
+    comments, next_cursor = keyset_page(
+        post_comments_queryset(pk),
+        COMMENT_PAGE_SIZE,
+        request.GET.get("before"),
+        field="created_at",
+    )
+    data = []
+    for comment in comments:
+        item = {
+            "id": comment.pk,
+            "author": comment.author.username,
+            "content": comment.content,
+            "created_at": comment.created_at.isoformat(),
+        }
+        if request.user == comment.author:
+            item["update_url"] = reverse("comment-update", args=[comment.pk])
+            item["delete_url"] = reverse("comment-delete", args=[comment.pk])
+        data.append(item)
+    return JsonResponse({"comments": data, "next": next_cursor})
+
+
+class PostListView(AnonymousPageCacheMixin, KeysetPaginationMixin, DjangoListView):
     model = Post
     template_name = "blog/post_list.html"  # Specify the template to use
     context_object_name = "posts"
-    ordering = ["-published_date"]  # Order posts by the published date (newest first)
+    # Newest first, one page at a time (see KeysetPaginationMixin)
+    queryset = Post.objects.select_related("author").prefetch_related("tags")
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        attach_versions(context["posts"])  # Keys the cached row of each post
+        context["tag_cloud"] = tag_cloud()
+        return context
 
-class PostDetailView(DjangoDetailView):
+
+class PostDetailView(AnonymousPageCacheMixin, DjangoDetailView):
     model = Post
+    queryset = Post.objects.select_related("author")
     template_name = "blog/post_detail.html"
 
+    def get_page_versions(self):
+        return [self.get_post_version()]
+
+    def get_post_version(self):
+        pk = self.kwargs["pk"]
+        return post_versions([pk])[pk]
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["comments"] = Comment.objects.filter(post=self.object).order_by(
-            "-created_at"
+        # Keys the cached body, tags and comment thread; the comments are
+        # only queried when that fragment has to be rendered again
+        context["post_version"] = self.get_post_version()
+        context["comment_page"] = LazyKeysetPage(
+            post_comments_queryset(self.object.pk), COMMENT_PAGE_SIZE, field="created_at"
         )
         context["comment_form"] = CommentForm()
         return context
@@ -173,20 +228,42 @@ class PostSearchView(DjangoListView):
 
     def get_queryset(self):
         query = self.request.GET.get("q")
-        if query:
-            return Post.objects.filter(
-                Q(title__icontains=query)
-                | Q(content__icontains=query)
-                | Q(tags__name__icontains=query)
-            ).distinct()
-        return Post.objects.none()
+        if not query:
+            return Post.objects.none()
+        # The search backend returns ids best match first; keep that order
+        ids = search_posts(query)
+        posts = Post.objects.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
 
 
-class PostByTagListView(DjangoListView):
+def suggest(request):
+    """JSON autocomplete suggestions for the search box, served from memory."""
+    try:
+        limit = int(request.GET.get("limit", 8))
+    except ValueError:
+        limit = 8
+    return JsonResponse({"suggestions": suggestions(request.GET.get("q", ""), max(limit, 1))})
+
+
+class PostByTagListView(AnonymousPageCacheMixin, KeysetPaginationMixin, DjangoListView):
     model = Post
     template_name = "blog/post_list.html"
     context_object_name = "posts"
+    queryset = Post.objects.select_related("author").prefetch_related("tags")
 
     def get_queryset(self):
-        tag = get_object_or_404(Tag, slug=self.kwargs.get("tag_slug"))
-        return Post.objects.filter(tags__in=[tag])
+        self.tag = get_object_or_404(Tag, slug=self.kwargs.get("tag_slug"))
+        # Semi-join on the tagged items instead of joining and de-duplicating
+        tagged = TaggedItem.objects.filter(
+            tag=self.tag, content_type=ContentType.objects.get_for_model(Post)
+        ).values("object_id")
+        return super().get_queryset().filter(pk__in=tagged)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["tag"] = self.tag
+        context["tag_post_count"] = tag_post_count(self.tag)
+        context["related_tags"] = related_tags(self.tag)
+        context["tag_cloud"] = tag_cloud()
+        attach_versions(context["posts"])
+        return context
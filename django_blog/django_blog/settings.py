@@ -91,6 +91,19 @@ DATABASES = {
 }
 
 
+# Cache
+# Local memory by default; point CACHE_BACKEND at
+# django.core.cache.backends.redis.RedisCache and CACHE_LOCATION at
+# redis://host:6379/0 to share cached pages between processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -0,0 +1,204 @@
+"""Token authentication that keeps resolved tokens in the cache.
+
+DRF's ``TokenAuthentication`` loads the token and its user with a join on
+every request. ``CachedTokenAuthentication`` serves ``ExpiringToken``s from
+two tiers instead: a small LRU in this process, whose entries live for a few
+seconds, and the default cache, shared by every process. The shared entry
+only holds the token key, user id, active flag and expiry, never the user's
+other fields (its password hash among them), so a hit there loads the user
+by primary key. Expiry is checked against the cached copy, and sliding
+renewal writes to the database at most once per ``TOKEN_RENEWAL_INTERVAL``,
+so a request served from the LRU costs no queries.
+
+Saving or deleting a token, or changing its user's password or active flag,
+evicts the token from the shared cache and this process's LRU once the
+transaction commits; other processes stop accepting it within
+``TOKEN_AUTH_LOCAL_TIMEOUT`` seconds. Token writes that skip signals, such
+as ``QuerySet.update()``, are only picked up when the shared entry expires
+after ``TOKEN_AUTH_CACHE_TIMEOUT`` seconds. Other user fields are read
+afresh on a shared-cache hit, and lag by at most ``TOKEN_AUTH_LOCAL_TIMEOUT``
+seconds in the LRU.
+"""
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from .models import ExpiringToken
+
+DEFAULT_TIMEOUT = 300
+DEFAULT_LOCAL_TIMEOUT = 10
+DEFAULT_LOCAL_SIZE = 1024
+# The user fields a cached token's validity depends on
+USER_AUTH_FIELDS = ('password', 'is_active')
+
+
+def cache_timeout():
+    return getattr(settings, 'TOKEN_AUTH_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def local_timeout():
+    return getattr(settings, 'TOKEN_AUTH_LOCAL_TIMEOUT', DEFAULT_LOCAL_TIMEOUT)
+
+
+def local_size():
+    return getattr(settings, 'TOKEN_AUTH_LOCAL_SIZE', DEFAULT_LOCAL_SIZE)
+
+
+def _cache_key(key):
+    # Keep the secret itself out of cache key names
+    return 'tokenauth:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+class LocalTokenCache:
+    """Thread-safe LRU of pickled tokens that expire after ``local_timeout()``.
+
+    Tokens are stored pickled so every request gets its own user instance,
+    as it would from the database. Unlike the shared cache, this never
+    leaves the process, so it can hold the whole user.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, data = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return pickle.loads(data)
+
+    def set(self, key, token):
+        timeout, size = local_timeout(), local_size()
+        if timeout <= 0 or size <= 0:
+            return
+        data = pickle.dumps(token, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+
+    def discard(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_tokens = LocalTokenCache()
+
+
+def invalidate_tokens(keys):
+    """Evict the tokens with ``keys`` from both cache tiers."""
+    cache_keys = [_cache_key(key) for key in keys]
+    local_tokens.discard(cache_keys)
+    cache.delete_many(cache_keys)
+
+
+def _shared_entry(token):
+    return {
+        'key': token.key,
+        'user_id': token.user_id,
+        'is_active': token.user.is_active,
+        'expires_at': token.expires_at,
+    }
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    model = ExpiringToken
+
+    def load_token(self, entry):
+        """Rebuild a token from its shared cache entry, loading the user by id."""
+        user = None
+        if entry['is_active']:
+            user = get_user_model()._default_manager.filter(pk=entry['user_id']).first()
+        if user is None:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return self.model(key=entry['key'], user=user, expires_at=entry['expires_at'])
+
+    def authenticate_credentials(self, key):
+        cache_key = _cache_key(key)
+        token = local_tokens.get(cache_key)
+        if token is None:
+            entry = cache.get(cache_key)
+            if entry is None:
+                # Unknown keys and inactive users fail here and are not cached
+                token = super().authenticate_credentials(key)[1]
+                cache.set(cache_key, _shared_entry(token), cache_timeout())
+            else:
+                token = self.load_token(entry)
+            local_tokens.set(cache_key, token)
+        now = timezone.now()
+        if token.is_expired(now):
+            raise exceptions.AuthenticationFailed(_('Token has expired.'))
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        if token.renew(now):
+            # Keep the cached copies in step with the new expiry
+            cache.set(cache_key, _shared_entry(token), cache_timeout())
+            local_tokens.set(cache_key, token)
+        return (token.user, token)
+
+
+def _evict_on_commit(keys):
+    transaction.on_commit(lambda: invalidate_tokens(keys))
+
+
+@receiver(post_save, sender=ExpiringToken, dispatch_uid='tokenauth-token-save')
+def _invalidate_saved_token(sender, instance, created, **kwargs):
+    if not created:
+        _evict_on_commit([instance.key])
+
+
+@receiver(post_delete, sender=ExpiringToken, dispatch_uid='tokenauth-token-delete')
+def _invalidate_deleted_token(sender, instance, **kwargs):
+    # Purged tokens have expired, which their cached copies already show
+    if not instance.is_expired():
+        _evict_on_commit([instance.key])
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL, dispatch_uid='tokenauth-user-check')
+def _check_user_auth_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._tokenauth_changed = False
+    if raw or instance._state.adding:
+        # A new user has no tokens yet
+        return
+    if update_fields is not None and not set(USER_AUTH_FIELDS) & set(update_fields):
+        # Such as update_last_login() on every sign-in
+        return
+    saved = sender._default_manager.filter(pk=instance.pk).values(*USER_AUTH_FIELDS).first()
+    instance._tokenauth_changed = saved is None or any(
+        saved[field] != getattr(instance, field) for field in USER_AUTH_FIELDS
+    )
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL, dispatch_uid='tokenauth-user-save')
+def _invalidate_user_tokens(sender, instance, **kwargs):
+    if not getattr(instance, '_tokenauth_changed', False):
+        return
+    tokens = ExpiringToken.objects.filter(user_id=instance.pk, expires_at__gt=timezone.now())
+    keys = list(tokens.values_list('key', flat=True))
+    if keys:
+        _evict_on_commit(keys)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import ExpiringToken
+
+
+class Command(BaseCommand):
+    help = 'Delete expired API tokens in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Tokens deleted per transaction.')
+
+    def handle(self, *args, batch_size, **options):
+        now = timezone.now()
+        expired = ExpiringToken.objects.filter(expires_at__lte=now)
+        purged = 0
+        while True:
+            # Walks the expires_at index; short transactions keep locks brief
+            with transaction.atomic():
+                batch = list(expired.order_by('expires_at').values_list('pk', flat=True)[:batch_size])
+                if not batch:
+                    break
+                purged += ExpiringToken.objects.filter(pk__in=batch).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} expired tokens.'))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from accounts.models import CustomUser, Follow
+
+
+def _total(field):
+    rows = Follow.objects.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(n=Count('pk'))
+    return Coalesce(Subquery(rows.values('n')), 0)
+
+
+class Command(BaseCommand):
+    help = 'Recompute CustomUser.followers_count and following_count where they have drifted.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Users examined per transaction.')
+        parser.add_argument('--dry-run', action='store_true', help='Report drifted users without fixing them.')
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        last_pk = 0
+        examined = fixed = 0
+        while True:
+            batch = list(
+                CustomUser.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1]
+            examined += len(batch)
+            with transaction.atomic():
+                drifted = list(
+                    CustomUser.objects.filter(pk__in=batch)
+                    .annotate(actual_followers=_total('followed'), actual_following=_total('follower'))
+                    .exclude(followers_count=F('actual_followers'), following_count=F('actual_following'))
+                    .values_list('pk', flat=True)
+                )
+                if drifted and not dry_run:
+                    CustomUser.objects.filter(pk__in=drifted).update(
+                        followers_count=_total('followed'), following_count=_total('follower')
+                    )
+            fixed += len(drifted)
+
+        verb = 'would be fixed' if dry_run else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f'Examined {examined} users; {fixed} {verb}.'))
@@ -0,0 +1,73 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_follow_counts(apps, schema_editor):
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    Follow = apps.get_model('accounts', 'Follow')
+
+    def total(field):
+        rows = Follow.objects.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(n=Count('pk'))
+        return Coalesce(Subquery(rows.values('n')), 0)
+
+    CustomUser.objects.update(followers_count=total('followed'), following_count=total('follower'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_remove_customuser_followers_customuser_following'),
+    ]
+
+    operations = [
+        # Adopt the auto-created through table as the Follow model without
+        # touching the existing rows.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='Follow',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('followed', models.ForeignKey(db_column='to_customuser_id', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                        ('follower', models.ForeignKey(db_column='from_customuser_id', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'accounts_customuser_following',
+                        'unique_together': {('follower', 'followed')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='customuser',
+                    name='following',
+                    field=models.ManyToManyField(blank=True, related_name='followers', through='accounts.Follow', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='follow',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['followed', 'follower'], name='follow_followed_idx'),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_follow_counts, migrations.RunPython.noop),
+    ]
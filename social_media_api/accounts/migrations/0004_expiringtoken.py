@@ -0,0 +1,41 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:50
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def copy_drf_tokens(apps, schema_editor):
+    # Existing clients keep their token, now with a full lifetime ahead
+    Token = apps.get_model('authtoken', 'Token')
+    ExpiringToken = apps.get_model('accounts', 'ExpiringToken')
+    expires_at = timezone.now() + timedelta(seconds=getattr(settings, 'TOKEN_LIFETIME', 14 * 24 * 3600))
+    ExpiringToken.objects.bulk_create(
+        [ExpiringToken(key=key, user_id=user_id, expires_at=expires_at)
+         for key, user_id in Token.objects.values_list('key', 'user_id').iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_follow'),
+        ('authtoken', '0002_auto_20160226_1747'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpiringToken',
+            fields=[
+                ('key', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='auth_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(copy_drf_tokens, migrations.RunPython.noop),
+    ]
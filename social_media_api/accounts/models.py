@@ -1,10 +1,85 @@
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
+
+DEFAULT_TOKEN_LIFETIME = 14 * 24 * 3600
+DEFAULT_TOKEN_RENEWAL_INTERVAL = 3600
+
+
+def token_lifetime():
+    return timedelta(seconds=getattr(settings, 'TOKEN_LIFETIME', DEFAULT_TOKEN_LIFETIME))
+
+
+def token_renewal_interval():
+    return timedelta(seconds=getattr(settings, 'TOKEN_RENEWAL_INTERVAL', DEFAULT_TOKEN_RENEWAL_INTERVAL))
+
 
 class CustomUser(AbstractUser):
     bio = models.TextField(max_length=500, blank=True)
     profile_picture = models.ImageField(upload_to='profile_pics/', null=True, blank=True)
-    following = models.ManyToManyField('self', symmetrical=False, related_name='followers', blank=True)
+    following = models.ManyToManyField('self', symmetrical=False, related_name='followers', through='Follow', blank=True)
+    # Denormalized from Follow; kept in step by accounts.signals.
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return self.username
+
+class Follow(models.Model):
+    """One edge of the follower graph (``follower`` follows ``followed``).
+
+    Maps onto the table of the former auto-created ``following`` through
+    model, hence the explicit column names.
+    """
+    follower = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='+', db_column='from_customuser_id')
+    followed = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='+', db_column='to_customuser_id')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'accounts_customuser_following'
+        unique_together = ('follower', 'followed')
+        indexes = [
+            models.Index(fields=['followed', 'follower'], name='follow_followed_idx'),
+        ]
+
+class ExpiringToken(models.Model):
+    """API token that expires unless it keeps being used.
+
+    Each login issues a new token. Using a token pushes ``expires_at`` back
+    to ``token_lifetime()`` from now, but at most once per
+    ``token_renewal_interval()``, so an active client causes one write an
+    hour rather than one per request. Deleting a token revokes it, and
+    ``manage.py purge_tokens`` deletes the expired ones.
+    """
+    key = models.CharField(max_length=40, primary_key=True)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='auth_tokens')
+    created = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def save(self, *args, **kwargs):
+        if not self.key:
+            self.key = secrets.token_hex(20)
+        if self.expires_at is None:
+            self.expires_at = timezone.now() + token_lifetime()
+        return super().save(*args, **kwargs)
+
+    def is_expired(self, now=None):
+        return self.expires_at <= (now or timezone.now())
+
+    def renew(self, now=None):
+        """Slide ``expires_at`` forward if it is due; return whether it was."""
+        expires_at = (now or timezone.now()) + token_lifetime()
+        due = expires_at - token_renewal_interval()
+        if self.expires_at > due:
+            return False
+        # Conditional, so concurrent requests with the same token write once
+        ExpiringToken.objects.filter(pk=self.pk, expires_at__lte=due).update(expires_at=expires_at)
+        self.expires_at = expires_at
+        return True
 
     def __str__(self):
-        return self.username
\ No newline at end of file
+        return self.key
@@ -1,5 +1,4 @@
 from rest_framework import serializers
-from rest_framework.authtoken.models import Token
 from django.contrib.auth import get_user_model
 from .models import CustomUser
 
@@ -17,7 +16,9 @@ class UserSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = CustomUser
-        fields = ('id', 'username', 'email', 'password', 'confirm_password', 'bio', 'profile_picture', 'token')
+        fields = ('id', 'username', 'email', 'password', 'confirm_password', 'bio', 'profile_picture', 'token',
+                  'followers_count', 'following_count')
+        read_only_fields = ('followers_count', 'following_count')
 
     def validate(self, data):
         if data['password'] != data['confirm_password']:
@@ -26,6 +27,4 @@ class UserSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data.pop('confirm_password')
-        user = get_user_model().objects.create_user(**validated_data)
-        Token.objects.create(user=user)
-        return user
+        return get_user_model().objects.create_user(**validated_data)
@@ -0,0 +1,47 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+from .models import CustomUser, Follow
+
+
+def _recount(user_ids):
+    """Recompute both follow counters of ``user_ids`` from the Follow table."""
+    def total(field):
+        rows = Follow.objects.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(n=Count('pk'))
+        return Coalesce(Subquery(rows.values('n')), 0)
+
+    CustomUser.objects.filter(pk__in=user_ids).update(
+        followers_count=total('followed'), following_count=total('follower')
+    )
+
+
+@receiver(m2m_changed, sender=Follow)
+def sync_follow_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    # Forward: instance.following changed; reverse: instance.followers changed.
+    own_field, other_field = (
+        ('followers_count', 'following_count') if reverse else ('following_count', 'followers_count')
+    )
+    # Atomic in-place updates; manage.py reconcile_follow_counts repairs any drift.
+    if action == 'post_add' and pk_set:
+        # pk_set only holds edges that were actually created.
+        CustomUser.objects.filter(pk=instance.pk).update(**{own_field: F(own_field) + len(pk_set)})
+        CustomUser.objects.filter(pk__in=pk_set).update(**{other_field: F(other_field) + 1})
+    elif action == 'pre_remove' and pk_set:
+        # pk_set holds every id passed to remove(), not only existing edges.
+        field = 'follower_id' if reverse else 'followed_id'
+        lookup = {'followed' if reverse else 'follower': instance, f'{field}__in': pk_set}
+        instance._removed_follow_ids = list(Follow.objects.filter(**lookup).values_list(field, flat=True))
+    elif action == 'post_remove' and pk_set:
+        removed = getattr(instance, '_removed_follow_ids', [])
+        if removed:
+            # Clamped: two racing removes of one edge both see it beforehand
+            CustomUser.objects.filter(pk=instance.pk).update(**{own_field: Greatest(F(own_field) - len(removed), 0)})
+            CustomUser.objects.filter(pk__in=removed).update(**{other_field: Greatest(F(other_field) - 1, 0)})
+    elif action == 'pre_clear':
+        lookup = {'followed': instance} if reverse else {'follower': instance}
+        field = 'follower_id' if reverse else 'followed_id'
+        instance._cleared_follow_ids = list(Follow.objects.filter(**lookup).values_list(field, flat=True))
+    elif action == 'post_clear':
+        _recount([instance.pk, *getattr(instance, '_cleared_follow_ids', [])])
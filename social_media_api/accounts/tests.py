@@ -1,3 +1,198 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .authentication import _cache_key, local_tokens
+from .models import ExpiringToken, Follow
+
+
+class FollowGraphTestCase(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.alice = User.objects.create_user(username='alice', password='pass12345')
+        self.bob = User.objects.create_user(username='bob', password='pass12345')
+        self.carol = User.objects.create_user(username='carol', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def assertCounts(self, user, followers, following):
+        user.refresh_from_db()
+        self.assertEqual((user.followers_count, user.following_count), (followers, following))
+
+    def test_follow_and_unfollow_keep_counts_in_sync(self):
+        self.client.post(f'/api/accounts/follow/{self.bob.pk}/')
+        self.client.post(f'/api/accounts/follow/{self.bob.pk}/')
+        self.assertCounts(self.alice, 0, 1)
+        self.assertCounts(self.bob, 1, 0)
+
+        self.client.post(f'/api/accounts/unfollow/{self.bob.pk}/')
+        self.client.post(f'/api/accounts/unfollow/{self.carol.pk}/')
+        self.assertCounts(self.alice, 0, 0)
+        self.assertCounts(self.bob, 0, 0)
+
+    def test_counters_update_in_place(self):
+        self.alice.following.add(self.carol)
+        with CaptureQueriesContext(connection) as queries:
+            self.alice.following.add(self.bob)
+        self.assertFalse(any('count(' in q['sql'].lower() for q in queries.captured_queries))
+        # Removing an edge that doesn't exist changes nothing
+        self.alice.following.remove(self.bob, self.alice)
+        self.assertCounts(self.alice, 0, 1)
+        self.assertCounts(self.bob, 0, 0)
+
+    def test_follow_unknown_user(self):
+        response = self.client.post('/api/accounts/follow/999/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_reconcile_command_repairs_drift(self):
+        Follow.objects.create(follower=self.alice, followed=self.bob)
+        get_user_model().objects.filter(pk=self.carol.pk).update(following_count=3)
+
+        out = StringIO()
+        call_command('reconcile_follow_counts', batch_size=1, stdout=out)
+        self.assertCounts(self.alice, 0, 1)
+        self.assertCounts(self.bob, 1, 0)
+        self.assertCounts(self.carol, 0, 0)
+        self.assertIn('3 fixed', out.getvalue())
+
+    def test_clear_recounts_both_sides(self):
+        self.alice.following.add(self.bob, self.carol)
+        self.alice.following.clear()
+        self.assertCounts(self.alice, 0, 0)
+        self.assertCounts(self.carol, 0, 0)
+
+    def test_relationships_are_resolved_in_two_queries(self):
+        Follow.objects.create(follower=self.alice, followed=self.bob)
+        Follow.objects.create(follower=self.carol, followed=self.alice)
+        ids = f'{self.bob.pk},{self.carol.pk}'
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/accounts/relationships/', {'ids': ids})
+        self.assertEqual(response.data, [
+            {'id': self.bob.pk, 'following': True, 'followed_by': False},
+            {'id': self.carol.pk, 'following': False, 'followed_by': True},
+        ])
+
+
+class CachedTokenAuthenticationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_tokens.clear()
+        self.user = get_user_model().objects.create_user(username='dave', password='pass12345')
+        self.token = ExpiringToken.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def get(self):
+        return self.client.get('/api/accounts/relationships/', {'ids': self.user.pk})
+
+    def test_warm_request_skips_the_token_query(self):
+        with self.assertNumQueries(3):
+            self.assertEqual(self.get().status_code, 200)
+        with self.assertNumQueries(2):
+            self.assertEqual(self.get().status_code, 200)
+        # The shared tier serves processes whose LRU is cold, loading only the user
+        local_tokens.clear()
+        with self.assertNumQueries(3):
+            self.assertEqual(self.get().status_code, 200)
+
+    def test_shared_cache_holds_no_user_fields(self):
+        self.get()
+        entry = cache.get(_cache_key(self.token.key))
+        self.assertEqual(set(entry), {'key', 'user_id', 'is_active', 'expires_at'})
+
+    def test_cached_inactive_user_is_rejected(self):
+        self.get()
+        local_tokens.clear()
+        # Skips the signal, so the shared entry still says active
+        get_user_model().objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.get()
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['detail'], 'User inactive or deleted.')
+
+    def test_deleted_token_is_rejected(self):
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        self.get()
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(self.get().status_code, 401)
+
+
+class ExpiringTokenTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_tokens.clear()
+        self.user = get_user_model().objects.create_user(username='erin', password='pass12345')
+        self.client = APIClient()
+
+    def login(self):
+        response = self.client.post('/api/accounts/login/', {'username': 'erin', 'password': 'pass12345'})
+        return response.data['token']
+
+    def get(self, key):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {key}')
+        return self.client.get('/api/accounts/relationships/')
+
+    def test_each_login_issues_its_own_token(self):
+        first, second = self.login(), self.login()
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.get(first).status_code, 200)
+        self.assertEqual(self.get(second).status_code, 200)
+
+    def test_expired_token_is_rejected(self):
+        key = self.login()
+        ExpiringToken.objects.filter(pk=key).update(expires_at=timezone.now() - timedelta(seconds=1))
+        response = self.get(key)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['detail'], 'Token has expired.')
+
+    @override_settings(TOKEN_LIFETIME=3600, TOKEN_RENEWAL_INTERVAL=600)
+    def test_renewal_writes_once_per_interval(self):
+        key = self.login()
+        token = ExpiringToken.objects.get(pk=key)
+        stale = token.expires_at - timedelta(seconds=601)
+        ExpiringToken.objects.filter(pk=key).update(expires_at=stale)
+        # The first use loads and renews the token; later ones hit the cache
+        with self.assertNumQueries(2):
+            self.get(key)
+        self.assertGreater(ExpiringToken.objects.get(pk=key).expires_at, token.expires_at)
+        with self.assertNumQueries(0):
+            self.get(key)
+        local_tokens.clear()
+        with self.assertNumQueries(1):
+            self.get(key)
+
+    def test_logout_and_rotate_revoke_the_token(self):
+        key = self.login()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/accounts/token/rotate/', HTTP_AUTHORIZATION=f'Token {key}')
+        rotated = response.data['token']
+        self.assertEqual(self.get(key).status_code, 401)
+        self.assertEqual(self.get(rotated).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.post('/api/accounts/logout/').status_code, 204)
+        self.assertEqual(self.get(rotated).status_code, 401)
+
+    def test_purge_deletes_only_expired_tokens(self):
+        live = self.login()
+        expired = [ExpiringToken(user=self.user, expires_at=timezone.now() - timedelta(days=1)) for _ in range(5)]
+        for token in expired:
+            token.save()
+        out = StringIO()
+        call_command('purge_tokens', batch_size=2, stdout=out)
+        self.assertIn('Purged 5 expired tokens.', out.getvalue())
+        self.assertEqual(list(ExpiringToken.objects.values_list('pk', flat=True)), [live])
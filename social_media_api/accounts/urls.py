@@ -4,8 +4,11 @@ from . import views
 urlpatterns = [
     path('register/', views.register, name='register'),
     path('login/', views.login, name='login'),
+    path('logout/', views.logout, name='logout'),
+    path('token/rotate/', views.rotate_token, name='rotate-token'),
     path('follow/<int:user_id>/', views.follow_user, name='follow-user'),
     path('unfollow/<int:user_id>/', views.unfollow_user, name='unfollow-user'),
+    path('relationships/', views.relationships, name='relationships'),
 ]
 
 
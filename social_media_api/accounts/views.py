@@ -1,16 +1,15 @@
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.authtoken.models import Token
 from rest_framework.permissions import AllowAny
 from django.contrib.auth import authenticate
 from django.shortcuts import get_object_or_404
 from .serializers import UserSerializer
 from rest_framework.permissions import IsAuthenticated
-from .models import CustomUser
+from .models import CustomUser, ExpiringToken, Follow
 from rest_framework import generics, permissions, status
 
-
+MAX_RELATIONSHIP_IDS = 100
 
 
 @api_view(['POST'])
@@ -19,7 +18,7 @@ def register(request):
     serializer = UserSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.save()
-        token, _ = Token.objects.get_or_create(user=user)
+        token = ExpiringToken.objects.create(user=user)
         return Response({
             'token': token.key,
             'user': UserSerializer(user).data
@@ -33,47 +32,68 @@ def login(request):
     password = request.data.get('password')
     user = authenticate(username=username, password=password)
     if user:
-        token, _ = Token.objects.get_or_create(user=user)
+        # Every login gets its own token, so signing in elsewhere never
+        # revokes or extends an existing session
+        token = ExpiringToken.objects.create(user=user)
         return Response({
             'token': token.key,
             'user': UserSerializer(user).data
         })
     return Response({'error': 'Invalid credentials'}, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def logout(request):
+    request.auth.delete()
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def rotate_token(request):
+    """Replace the current token with a fresh one."""
+    token = ExpiringToken.objects.create(user=request.user)
+    request.auth.delete()
+    return Response({'token': token.key})
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def follow_user(request, user_id):
-    user_to_follow = get_object_or_404(CustomUser, id=user_id)
-    if request.user != user_to_follow:
-        request.user.following.add(user_to_follow)
-        return Response({'status': 'following'}, status=status.HTTP_200_OK)
-    return Response({'error': 'Cannot follow yourself'}, status=status.HTTP_400_BAD_REQUEST)
+    if request.user.pk == user_id:
+        return Response({'error': 'Cannot follow yourself'}, status=status.HTTP_400_BAD_REQUEST)
+    user_to_follow = get_object_or_404(CustomUser.objects.only('pk'), id=user_id)
+    request.user.following.add(user_to_follow)
+    return Response({'status': 'following'}, status=status.HTTP_200_OK)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def unfollow_user(request, user_id):
-    user_to_unfollow = get_object_or_404(CustomUser, id=user_id)
-    request.user.following.remove(user_to_unfollow)
+    # remove() is a no-op for unknown ids, so there is nothing to look up first.
+    request.user.following.remove(user_id)
     return Response({'status': 'unfollowed'}, status=status.HTTP_200_OK)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def relationships(request):
+    """Follow status between the current user and up to 100 ``ids`` in two queries."""
+    try:
+        ids = {int(pk) for pk in request.query_params.get('ids', '').split(',') if pk}
+    except ValueError:
+        return Response({'error': 'ids must be a comma-separated list of user ids'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > MAX_RELATIONSHIP_IDS:
+        return Response({'error': f'At most {MAX_RELATIONSHIP_IDS} ids per request'}, status=status.HTTP_400_BAD_REQUEST)
+    following = set(
+        Follow.objects.filter(follower=request.user, followed_id__in=ids).values_list('followed_id', flat=True)
+    )
+    followed_by = set(
+        Follow.objects.filter(followed=request.user, follower_id__in=ids).values_list('follower_id', flat=True)
+    )
+    return Response([
+        {'id': pk, 'following': pk in following, 'followed_by': pk in followed_by}
+        for pk in sorted(ids)
+    ])
+
 
 class UserListView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
     queryset = CustomUser.objects.all()
     serializer_class = UserSerializer
-
-@api_view(['POST'])
-@permission_classes([permissions.IsAuthenticated])
-def follow_user(request, user_id):
-    user_to_follow = get_object_or_404(CustomUser, id=user_id)
-    if request.user != user_to_follow:
-        request.user.following.add(user_to_follow)
-        return Response({'status': 'following'}, status=status.HTTP_200_OK)
-    return Response({'error': 'Cannot follow yourself'}, status=status.HTTP_400_BAD_REQUEST)
-
-@api_view(['POST'])
-@permission_classes([permissions.IsAuthenticated])
-def unfollow_user(request, user_id):
-    user_to_unfollow = get_object_or_404(CustomUser, id=user_id)
-    request.user.following.remove(user_to_unfollow)
-    return Response({'status': 'unfollowed'}, status=status.HTTP_200_OK)
\ No newline at end of file
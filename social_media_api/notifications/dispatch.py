@@ -0,0 +1,191 @@
+"""Batched, asynchronous notification delivery.
+
+``notify()`` writes a ``PendingNotification`` outbox row in the caller's
+transaction, so an event survives a crash exactly when the change behind it
+does, and wakes the dispatcher once that transaction commits. A single
+background worker then drains the outbox into ``Notification`` rows, batching
+the wake-ups of a busy second into one drain and coalescing events that share
+a recipient, verb and target (so a viral post yields one "A and 12 others
+liked your post" row per recipient rather than one row per like).
+"""
+import atexit
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, transaction
+
+from .models import Notification, NotificationActor, PendingNotification
+from .unread import add_unread
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+
+def batch_size():
+    return getattr(settings, 'NOTIFICATION_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+
+
+def flush_interval():
+    return getattr(settings, 'NOTIFICATION_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+
+
+def dispatch_async():
+    return getattr(settings, 'NOTIFICATION_DISPATCH_ASYNC', True)
+
+
+def _key(item):
+    return (item.recipient_id, item.verb, item.content_type_id, item.object_id)
+
+
+def coalesce(pending):
+    """Turn outbox rows into notifications, merging into unread ones."""
+    groups = {}
+    for item in pending:
+        groups.setdefault(_key(item), []).append(item)
+
+    # Locked so concurrent drains can't both merge into the same row.
+    existing = {}
+    unread = Notification.objects.select_for_update().filter(
+        is_read=False,
+        recipient_id__in={key[0] for key in groups},
+        verb__in={key[1] for key in groups},
+        content_type_id__in={key[2] for key in groups},
+        object_id__in={key[3] for key in groups},
+    ).order_by('timestamp')
+    for notification in unread:
+        existing[_key(notification)] = notification
+    known = set()
+    if existing:
+        known = set(NotificationActor.objects.filter(
+            notification__in=existing.values(), actor_id__in={item.actor_id for item in pending},
+        ).values_list('notification_id', 'actor_id'))
+
+    to_create, to_update, new_actors = [], [], []
+    for key, items in groups.items():
+        latest = items[-1]
+        actor_ids = {item.actor_id for item in items}
+        notification = existing.get(key)
+        if notification is None:
+            notification = Notification(
+                recipient_id=latest.recipient_id,
+                actor_id=latest.actor_id,
+                actor_count=len(actor_ids),
+                verb=latest.verb,
+                content_type_id=latest.content_type_id,
+                object_id=latest.object_id,
+            )
+            to_create.append(notification)
+        else:
+            actor_ids = {actor_id for actor_id in actor_ids if (notification.pk, actor_id) not in known}
+            notification.actor_id = latest.actor_id
+            notification.actor_count += len(actor_ids)
+            # Move the merged row up the list, as a new one would be
+            notification.timestamp = latest.created_at
+            to_update.append(notification)
+        new_actors.append((notification, actor_ids))
+
+    Notification.objects.bulk_create(to_create)
+    Notification.objects.bulk_update(to_update, ['actor', 'actor_count', 'timestamp'])
+    NotificationActor.objects.bulk_create([
+        NotificationActor(notification_id=notification.pk, actor_id=actor_id)
+        for notification, actor_ids in new_actors
+        for actor_id in actor_ids
+    ])
+    created_for = Counter(notification.recipient_id for notification in to_create)
+
+    # Applied after commit so a rolled-back drain doesn't skew the cached count.
+    def bump_unread_counts():
+        for user_id, delta in created_for.items():
+            add_unread(user_id, delta)
+
+    transaction.on_commit(bump_unread_counts)
+
+
+def drain_outbox(limit=None):
+    """Deliver everything waiting in the outbox; return how many rows were drained."""
+    limit = limit or batch_size()
+    drained = 0
+    while True:
+        with transaction.atomic():
+            pending = list(
+                PendingNotification.objects.select_for_update(skip_locked=True).order_by('pk')[:limit]
+            )
+            if not pending:
+                return drained
+            coalesce(pending)
+            PendingNotification.objects.filter(pk__in=[item.pk for item in pending]).delete()
+        drained += len(pending)
+
+
+class NotificationDispatcher:
+    """Drains the outbox in a background worker.
+
+    Each committed ``notify()`` wakes it; the first wake-up starts a timer
+    and the drain runs when it fires, or at once when ``batch_size()``
+    wake-ups are waiting, so bursts of events share one drain.
+    """
+
+    def __init__(self):
+        self._waiting = 0
+        self._lock = threading.Lock()
+        self._timer = None
+        self._executor = None
+
+    def _submit(self):
+        if not dispatch_async():
+            self.flush()
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='notifications')
+        self._executor.submit(self._flush_in_worker)
+
+    def wake(self):
+        with self._lock:
+            self._waiting += 1
+            full = self._waiting >= batch_size()
+            if not full and self._timer is None and dispatch_async():
+                self._timer = threading.Timer(flush_interval(), self._submit)
+                self._timer.daemon = True
+                self._timer.start()
+        if full or not dispatch_async():
+            self._submit()
+
+    def flush(self):
+        with self._lock:
+            self._waiting = 0
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        drain_outbox()
+
+    def _flush_in_worker(self):
+        try:
+            self.flush()
+        finally:
+            # Connections are per thread; don't leak the worker's.
+            connections.close_all()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        if self._waiting:
+            self.flush()
+
+
+dispatcher = NotificationDispatcher()
+atexit.register(dispatcher.shutdown)
+
+
+def notify(recipient, actor, verb, target):
+    """Record a notification in the outbox, to be delivered after the current transaction commits."""
+    PendingNotification.objects.create(
+        recipient_id=recipient.pk,
+        actor_id=actor.pk,
+        verb=verb,
+        content_type=ContentType.objects.get_for_model(target),
+        object_id=target.pk,
+    )
+    transaction.on_commit(dispatcher.wake)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from notifications.dispatch import drain_outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver notifications left in the outbox, e.g. after a worker crash.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Outbox rows delivered per transaction.')
+
+    def handle(self, *args, batch_size, **options):
+        drained = drain_outbox(limit=batch_size)
+        self.stdout.write(self.style.SUCCESS(f'Delivered {drained} pending notifications.'))
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.2 on 2026-10-18 18:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def record_latest_actors(apps, schema_editor):
+    # Only unread notifications are merged into; earlier actors are unknown,
+    # so each starts with its latest one.
+    Notification = apps.get_model('notifications', 'Notification')
+    NotificationActor = apps.get_model('notifications', 'NotificationActor')
+    rows = Notification.objects.filter(is_read=False).values_list('pk', 'actor_id')
+    batch = []
+    for pk, actor_id in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(NotificationActor(notification_id=pk, actor_id=actor_id))
+        if len(batch) == BATCH_SIZE:
+            NotificationActor.objects.bulk_create(batch)
+            batch = []
+    NotificationActor.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notification_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationActor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('actor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('notification', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='notifications.notification')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('notification', 'actor'), name='notification_actor_unique')],
+            },
+        ),
+        migrations.RunPython(record_latest_actors, migrations.RunPython.noop),
+    ]
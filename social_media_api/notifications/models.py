@@ -2,10 +2,29 @@ from django.db import models
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.contrib.contenttypes.prefetch import GenericPrefetch
+from posts.models import Comment, Post
+
+class NotificationQuerySet(models.QuerySet):
+    def for_display(self):
+        """Load actors and targets in bulk.
+
+        Targets are prefetched through the generic relation, which groups
+        them by content type and loads each type with one query; the listed
+        querysets also pull in what each target's summary needs.
+        """
+        targets = GenericPrefetch('target', [
+            Post.objects.all(),
+            Comment.objects.select_related('author', 'post'),
+        ])
+        return self.select_related('actor', 'content_type').prefetch_related(targets)
 
 class Notification(models.Model):
     recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
     actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # How many distinct actors (see NotificationActor) this unread
+    # notification stands for; the latest is `actor`.
+    actor_count = models.PositiveIntegerField(default=1)
     verb = models.CharField(max_length=255)
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
     object_id = models.PositiveIntegerField()
@@ -13,5 +32,43 @@ class Notification(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
 
+    objects = NotificationQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-timestamp', '-id']
+        indexes = [
+            models.Index(fields=['recipient', '-timestamp', '-id'], name='notif_recipient_recent_idx'),
+            models.Index(fields=['recipient', 'is_read', '-timestamp'], name='notif_recipient_read_idx'),
+            models.Index(
+                fields=['recipient', '-id'], condition=models.Q(is_read=False), name='notif_unread_idx'
+            ),
+        ]
+
+class PendingNotification(models.Model):
+    """Outbox row for a notification that has not been delivered yet.
+
+    ``notify()`` writes one in the caller's transaction, so it is kept exactly
+    when the change that caused it is. The dispatcher drains them into
+    coalesced ``Notification`` rows; anything left behind by a crash is
+    picked up by ``manage.py drain_notifications``.
+    """
+    recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    verb = models.CharField(max_length=255)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+class NotificationActor(models.Model):
+    """One distinct actor behind a coalesced notification.
+
+    Lets ``actor_count`` count people rather than events, so liking,
+    unliking and liking again doesn't turn one fan into two.
+    """
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE, related_name='+')
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+
     class Meta:
-        ordering = ['-timestamp']
\ No newline at end of file
+        constraints = [
+            models.UniqueConstraint(fields=['notification', 'actor'], name='notification_actor_unique'),
+        ]
@@ -0,0 +1,6 @@
+from posts.pagination import KeysetPagination
+
+
+class NotificationPagination(KeysetPagination):
+    page_size = 20
+    position_field = 'timestamp'
@@ -3,7 +3,26 @@ from .models import Notification
 
 class NotificationSerializer(serializers.ModelSerializer):
     actor = serializers.StringRelatedField()
+    summary = serializers.SerializerMethodField()
+    target = serializers.SerializerMethodField()
 
     class Meta:
         model = Notification
-        fields = ['id', 'actor', 'verb', 'timestamp', 'is_read']
+        fields = ['id', 'actor', 'actor_count', 'verb', 'summary', 'target', 'timestamp', 'is_read']
+
+    def get_summary(self, notification):
+        others = notification.actor_count - 1
+        if others <= 0:
+            return f'{notification.actor} {notification.verb}'
+        noun = 'other' if others == 1 else 'others'
+        return f'{notification.actor} and {others} {noun} {notification.verb}'
+
+    def get_target(self, notification):
+        target = notification.target
+        if target is None:
+            return None
+        return {
+            'type': notification.content_type.model,
+            'id': notification.object_id,
+            'title': getattr(target, 'title', str(target)),
+        }
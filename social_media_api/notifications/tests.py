@@ -1,3 +1,133 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from posts.models import Post
+from .dispatch import dispatcher
+from .models import Notification, PendingNotification
+
+
+@override_settings(NOTIFICATION_DISPATCH_ASYNC=False)
+class NotificationDispatchTestCase(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.author = User.objects.create_user(username='author', password='pass12345')
+        self.post = Post.objects.create(author=self.author, title='viral', content='...')
+        self.fans = [User.objects.create_user(username=f'fan{i}', password='pass12345') for i in range(3)]
+
+    def like(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            client.post(f'/api/posts/posts/{self.post.pk}/like/')
+
+    def test_likes_coalesce_into_one_notification(self):
+        for fan in self.fans:
+            self.like(fan)
+
+        notification = Notification.objects.get(recipient=self.author)
+        self.assertEqual(notification.actor, self.fans[-1])
+        self.assertEqual(notification.actor_count, 3)
+        self.assertFalse(PendingNotification.objects.exists())
+
+        client = APIClient()
+        client.force_authenticate(self.author)
+        response = client.get('/api/notifications/')
+        self.assertEqual(response.data['results'][0]['summary'], 'fan2 and 2 others liked your post')
+
+    def test_repeat_likes_count_one_actor_and_move_to_the_top(self):
+        self.like(self.fans[0])
+        timestamp = Notification.objects.get().timestamp
+        client = APIClient()
+        client.force_authenticate(self.fans[0])
+        client.post(f'/api/posts/posts/{self.post.pk}/unlike/')
+        self.like(self.fans[0])
+
+        notification = Notification.objects.get()
+        self.assertEqual(notification.actor_count, 1)
+        self.assertGreater(notification.timestamp, timestamp)
+
+    def test_read_notifications_are_not_reused(self):
+        self.like(self.fans[0])
+        Notification.objects.update(is_read=True)
+        self.like(self.fans[1])
+        self.assertEqual(Notification.objects.filter(is_read=False).count(), 1)
+
+    def test_flush_drains_the_outbox(self):
+        with self.settings(NOTIFICATION_DISPATCH_ASYNC=True, NOTIFICATION_FLUSH_INTERVAL=60):
+            for fan in self.fans:
+                self.like(fan)
+            self.assertEqual(PendingNotification.objects.count(), 3)
+            self.assertFalse(Notification.objects.exists())
+            dispatcher.flush()
+        self.assertEqual(Notification.objects.get().actor_count, 3)
+
+
+@override_settings(NOTIFICATION_DISPATCH_ASYNC=False)
+class UnreadNotificationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user(username='reader', password='pass12345')
+        actor = User.objects.create_user(username='actor', password='pass12345')
+        posts = [Post.objects.create(author=self.user, title=f'post {i}', content='...') for i in range(3)]
+        self.notifications = [
+            Notification.objects.create(recipient=self.user, actor=actor, verb='liked your post', target=post)
+            for post in posts
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_unread_count_is_served_from_cache(self):
+        self.assertEqual(self.client.get('/api/notifications/unread-count/').data['unread_count'], 3)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/notifications/unread-count/')
+        self.assertEqual(response.data['unread_count'], 3)
+
+    def test_mark_read_up_to_cursor(self):
+        self.client.get('/api/notifications/unread-count/')
+        response = self.client.post('/api/notifications/mark-read/', {'up_to': self.notifications[1].pk})
+        self.assertEqual(response.data['marked'], 2)
+        self.assertEqual(self.client.get('/api/notifications/unread-count/').data['unread_count'], 1)
+
+        response = self.client.get('/api/notifications/', {'unread': 1})
+        self.assertEqual([n['id'] for n in response.data['results']], [self.notifications[2].pk])
+
+
+class NotificationListQueryTestCase(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username='reader', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_notifications(self, count):
+        start = Notification.objects.count()
+        for i in range(start, start + count):
+            actor = get_user_model().objects.create_user(username=f'actor{i}', password='pass12345')
+            post = Post.objects.create(author=self.user, title=f'post {i}', content='...')
+            comment = post.comments.create(author=actor, content='nice')
+            Notification.objects.create(recipient=self.user, actor=actor, verb='liked your post', target=post)
+            Notification.objects.create(recipient=self.user, actor=actor, verb='commented', target=comment)
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/notifications/')
+        return len(queries), response
+
+    def test_list_runs_constant_queries(self):
+        self.add_notifications(1)
+        few, _ = self.count_queries()
+        self.add_notifications(4)
+        many, response = self.count_queries()
+        self.assertEqual(few, many)
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_target_summary(self):
+        self.add_notifications(1)
+        _, response = self.count_queries()
+        like = next(n for n in response.data['results'] if n['target']['type'] == 'post')
+        self.assertEqual(like['target']['title'], 'post 0')
@@ -0,0 +1,34 @@
+"""Cached per-user unread notification counts.
+
+The count is computed once from the partial unread index and then kept in
+the cache: delivery increments it and marking notifications read drops it.
+"""
+from django.core.cache import cache
+
+from .models import Notification
+
+UNREAD_TTL = 60 * 60
+
+
+def _cache_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def unread_count(user):
+    count = cache.get(_cache_key(user.pk))
+    if count is None:
+        count = Notification.objects.filter(recipient=user, is_read=False).count()
+        cache.set(_cache_key(user.pk), count, UNREAD_TTL)
+    return count
+
+
+def add_unread(user_id, delta):
+    try:
+        cache.incr(_cache_key(user_id), delta)
+    except ValueError:
+        # Not cached yet; the next read counts from the database.
+        pass
+
+
+def reset_unread(user_id):
+    cache.delete(_cache_key(user_id))
@@ -3,4 +3,6 @@ from . import views
 
 urlpatterns = [
     path('', views.NotificationListView.as_view(), name='notification-list'),
+    path('unread-count/', views.unread_notification_count, name='notification-unread-count'),
+    path('mark-read/', views.mark_notifications_read, name='notification-mark-read'),
 ]
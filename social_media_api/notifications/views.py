@@ -1,40 +1,38 @@
-
 from rest_framework import generics, permissions, status
-from rest_framework.decorators import action
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework import status
-from .models import Like
 from notifications.models import Notification
+from .pagination import NotificationPagination
 from .serializers import NotificationSerializer
-
-class PostViewSet(viewsets.ModelViewSet):
-    @action(detail=True, methods=['POST'])
-    def like(self, request, pk=None):
-        post = self.get_object()
-        user = request.user
-        
-        like, created = Like.objects.get_or_create(user=user, post=post)
-        if created:
-            Notification.objects.create(
-                recipient=post.author,
-                actor=user,
-                verb='liked your post',
-                target=post
-            )
-            return Response({'status': 'post liked'})
-        return Response({'status': 'already liked'})
-
-    @action(detail=True, methods=['POST'])
-    def unlike(self, request, pk=None):
-        post = self.get_object()
-        user = request.user
-        
-        Like.objects.filter(user=user, post=post).delete()
-        return Response({'status': 'post unliked'})
+from .unread import reset_unread, unread_count
 
 class NotificationListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = NotificationSerializer
+    pagination_class = NotificationPagination
 
     def get_queryset(self):
-        return Notification.objects.filter(recipient=self.request.user)
\ No newline at end of file
+        queryset = Notification.objects.for_display().filter(recipient=self.request.user)
+        if self.request.query_params.get('unread'):
+            queryset = queryset.filter(is_read=False)
+        return queryset
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def unread_notification_count(request):
+    return Response({'unread_count': unread_count(request.user)})
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def mark_notifications_read(request):
+    """Mark every unread notification with an id up to ``up_to`` (default: all) as read."""
+    notifications = Notification.objects.filter(recipient=request.user, is_read=False)
+    up_to = request.data.get('up_to')
+    if up_to is not None:
+        try:
+            notifications = notifications.filter(id__lte=int(up_to))
+        except (TypeError, ValueError):
+            return Response({'error': 'up_to must be a notification id'}, status=status.HTTP_400_BAD_REQUEST)
+    marked = notifications.update(is_read=True)
+    reset_unread(request.user.pk)
+    return Response({'marked': marked})
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.models import Comment, Like, Post
+
+
+def _total(model):
+    rows = model.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(n=Count('pk'))
+    return Coalesce(Subquery(rows.values('n')), 0)
+
+
+class Command(BaseCommand):
+    help = 'Recompute Post.like_count and Post.comment_count where they have drifted.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Posts examined per transaction.')
+        parser.add_argument('--dry-run', action='store_true', help='Report drifted posts without fixing them.')
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        last_pk = 0
+        examined = fixed = 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1]
+            examined += len(batch)
+            with transaction.atomic():
+                drifted = list(
+                    Post.objects.filter(pk__in=batch)
+                    .annotate(actual_likes=_total(Like), actual_comments=_total(Comment))
+                    .exclude(like_count=F('actual_likes'), comment_count=F('actual_comments'))
+                    .values_list('pk', flat=True)
+                )
+                if drifted and not dry_run:
+                    Post.objects.filter(pk__in=drifted).update(
+                        like_count=_total(Like), comment_count=_total(Comment)
+                    )
+            fixed += len(drifted)
+
+        verb = 'would be fixed' if dry_run else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f'Examined {examined} posts; {fixed} {verb}.'))
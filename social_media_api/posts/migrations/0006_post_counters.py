@@ -0,0 +1,38 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:06
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Like = apps.get_model('posts', 'Like')
+    Comment = apps.get_model('posts', 'Comment')
+
+    def total(model):
+        rows = model.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(n=Count('pk'))
+        return Coalesce(Subquery(rows.values('n')), 0)
+
+    Post.objects.update(like_count=total(Like), comment_count=total(Comment))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_comment_post_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,49 @@
 from django.db import models
 from django.conf import settings
 
+# How many of a post's latest comments are embedded when posts are listed.
+COMMENT_PREVIEW_SIZE = 3
+
+class PostQuerySet(models.QuerySet):
+    def for_display(self):
+        """Load authors and the latest comments in bulk.
+
+        A page of posts costs the same few queries regardless of its size
+        or how many comments each post has.
+        """
+        latest_comments = (
+            Comment.objects.select_related('author')
+            .order_by('-created_at', '-id')[:COMMENT_PREVIEW_SIZE]
+        )
+        return (
+            self.select_related('author')
+            .prefetch_related(models.Prefetch('comments', queryset=latest_comments, to_attr='latest_comments'))
+        )
+
+    def bump(self, pk, **deltas):
+        """Atomically add ``deltas`` to the counter columns of post ``pk``."""
+        return self.filter(pk=pk).update(
+            **{field: models.F(field) + delta for field, delta in deltas.items()}
+        )
+
 class Post(models.Model):
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     title = models.CharField(max_length=200)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized counters, kept in step by the like/unlike and comment
+    # endpoints; `manage.py reconcile_post_counters` repairs any drift.
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='post_recent_idx'),
+            models.Index(fields=['author', '-created_at'], name='post_author_recent_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -18,6 +55,12 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='comment_recent_idx'),
+            models.Index(fields=['post', '-created_at', '-id'], name='comment_post_recent_idx'),
+        ]
+
     def __str__(self):
         return f'Comment by {self.author.username} on {self.post.title}'
 
@@ -27,4 +70,27 @@ class Like(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ('user', 'post')
\ No newline at end of file
+        unique_together = ('user', 'post')
+
+class TimelineEntry(models.Model):
+    """A post materialized into one follower's home timeline.
+
+    Rows are written when a post is created (fan-out on write) and pruned on
+    unfollow; deleting the post cascades. ``author`` and ``created_at`` are
+    copied from the post so a page of the feed is a single range scan over
+    ``(owner, created_at, post)`` without touching the posts table.
+    """
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='timeline_entries')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='timeline_entries')
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('owner', 'post')
+        indexes = [
+            models.Index(fields=['owner', '-created_at', '-post'], name='timeline_owner_recent_idx'),
+            models.Index(fields=['owner', 'author'], name='timeline_owner_author_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} in timeline of {self.owner_id}'
@@ -0,0 +1,98 @@
+import base64
+import binascii
+from collections import OrderedDict
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def older_than(created_at, pk, pk_field='id', field='created_at'):
+    """Filter for rows strictly after ``(created_at, pk)`` in newest-first order."""
+    return Q(**{f'{field}__lt': created_at}) | Q(**{field: created_at, f'{pk_field}__lt': pk})
+
+
+class KeysetPagination(BasePagination):
+    """Newest-first pagination on ``(created_at, id)`` with opaque cursors.
+
+    Each page is a single ``WHERE (created_at, id) < cursor ORDER BY ... LIMIT``
+    query, so deep pages cost the same as the first one and no ``COUNT(*)``
+    is issued. Subclasses may key on another timestamp via ``position_field``.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    position_field = 'created_at'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, created_at, pk):
+        raw = f'{created_at.isoformat()}|{pk}'.encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_at, pk = base64.urlsafe_b64decode(encoded.encode()).decode().split('|')
+            return datetime.fromisoformat(created_at), int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate(self, request, fetch):
+        """Return one page from ``fetch(position, limit)``.
+
+        ``fetch`` receives the decoded cursor position (or ``None``) and must
+        return up to ``limit`` rows newest first; one row beyond the page size
+        is requested to learn whether a next page exists.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        rows = list(fetch(self.decode_cursor(request), page_size + 1))
+        page = rows[:page_size]
+        self.next_position = None
+        if len(rows) > len(page):
+            self.next_position = (getattr(page[-1], self.position_field), page[-1].pk)
+        return page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        def fetch(position, limit):
+            rows = queryset
+            if position is not None:
+                rows = rows.filter(older_than(*position, field=self.position_field))
+            return rows.order_by(f'-{self.position_field}', '-id')[:limit]
+
+        return self.paginate(request, fetch)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(*self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
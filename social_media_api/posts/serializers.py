@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Post, Comment
+from .models import Post, Comment, COMMENT_PREVIEW_SIZE
 
 class CommentSerializer(serializers.ModelSerializer):
     author = serializers.ReadOnlyField(source='author.username')
@@ -11,10 +11,18 @@ class CommentSerializer(serializers.ModelSerializer):
 
 class PostSerializer(serializers.ModelSerializer):
     author = serializers.ReadOnlyField(source='author.username')
-    comments = CommentSerializer(many=True, read_only=True)
+    comments = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
-        fields = ['id', 'title', 'content', 'author', 'created_at', 'updated_at', 'comments']
-        read_only_fields = ['created_at', 'updated_at']
+        fields = ['id', 'title', 'content', 'author', 'created_at', 'updated_at', 'comments', 'like_count', 'comment_count']
+        read_only_fields = ['created_at', 'updated_at', 'like_count', 'comment_count']
+
+    # Posts loaded through Post.objects.for_display() carry latest_comments;
+    # the fallback only runs for single posts such as a create response.
+    def get_comments(self, post):
+        comments = getattr(post, 'latest_comments', None)
+        if comments is None:
+            comments = post.comments.select_related('author').order_by('-created_at', '-id')[:COMMENT_PREVIEW_SIZE]
+        return CommentSerializer(comments, many=True).data
 
@@ -0,0 +1,36 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+
+from accounts.models import CustomUser, Follow
+
+from . import timeline
+from .caching import invalidate_on_change
+from .models import Comment, Like, Post, TimelineEntry
+
+# Cached post responses embed comments, like counts and author usernames.
+invalidate_on_change(Post, Comment, Like)
+# Logins, profile edits and follower counts don't show up in them.
+invalidate_on_change(CustomUser, fields=['username'])
+
+
+@receiver(post_save, sender=Post)
+def fan_out_new_post(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: timeline.fan_out_post(instance))
+
+
+@receiver(m2m_changed, sender=Follow)
+def sync_timeline_on_follow(sender, instance, action, reverse, pk_set, **kwargs):
+    # Forward: instance follows/unfollows pk_set. Reverse: pk_set follow instance.
+    if action == 'pre_clear':
+        lookup = {'author': instance} if reverse else {'owner': instance}
+        TimelineEntry.objects.filter(**lookup).delete()
+        return
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+    owner_ids, author_ids = (pk_set, [instance.pk]) if reverse else ([instance.pk], pk_set)
+    if action == 'post_add':
+        timeline.backfill(owner_ids, author_ids)
+    else:
+        timeline.prune(owner_ids, author_ids)
@@ -1,3 +1,268 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .caching import cache_stats
+from .models import Post, TimelineEntry
+
+
+class TimelineTestCase(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.reader = User.objects.create_user(username='reader', password='pass12345')
+        self.author = User.objects.create_user(username='author', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def create_post(self, author, title):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Post.objects.create(author=author, title=title, content='...')
+
+    def test_post_is_fanned_out_to_followers(self):
+        self.reader.following.add(self.author)
+        post = self.create_post(self.author, 'hello')
+        self.assertTrue(TimelineEntry.objects.filter(owner=self.reader, post=post).exists())
+
+        response = self.client.get('/api/posts/feed/')
+        self.assertEqual([p['id'] for p in response.data['results']], [post.id])
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        older = self.create_post(self.author, 'older')
+        self.reader.following.add(self.author)
+        self.assertTrue(TimelineEntry.objects.filter(owner=self.reader, post=older).exists())
+
+        self.reader.following.remove(self.author)
+        self.assertFalse(TimelineEntry.objects.filter(owner=self.reader).exists())
+
+    @override_settings(TIMELINE_FANOUT_MAX_FOLLOWERS=0)
+    def test_large_accounts_are_read_on_demand(self):
+        self.reader.following.add(self.author)
+        post = self.create_post(self.author, 'viral')
+        self.assertFalse(TimelineEntry.objects.exists())
+
+        response = self.client.get('/api/posts/feed/')
+        self.assertEqual([p['id'] for p in response.data['results']], [post.id])
+
+    def test_feed_pages_by_position(self):
+        self.reader.following.add(self.author)
+        posts = [self.create_post(self.author, f'post {i}') for i in range(3)]
+
+        response = self.client.get('/api/posts/feed/', {'page_size': 2})
+        self.assertEqual([p['id'] for p in response.data['results']], [posts[2].id, posts[1].id])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([p['id'] for p in response.data['results']], [posts[0].id])
+
+
+class KeysetPaginationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='writer', password='pass12345')
+        self.posts = [
+            Post.objects.create(author=self.user, title=f'post {i}', content='...') for i in range(5)
+        ]
+        self.client = APIClient()
+
+    def test_pages_follow_opaque_cursors_without_count(self):
+        seen = []
+        url = '/api/posts/posts/?page_size=2'
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertFalse(any('count(' in q['sql'].lower() for q in queries.captured_queries))
+            seen.extend(p['id'] for p in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, [p.id for p in reversed(self.posts)])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/api/posts/posts/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class PostQueryCountTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.reader = User.objects.create_user(username='reader', password='pass12345')
+        for i in range(8):
+            author = User.objects.create_user(username=f'author{i}', password='pass12345')
+            self.reader.following.add(author)
+            with self.captureOnCommitCallbacks(execute=True):
+                post = Post.objects.create(author=author, title=f'post {i}', content='...')
+            for j in range(5):
+                post.comments.create(author=author, content=f'comment {j}')
+            Post.objects.bump(post.pk, comment_count=5)
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def count_queries(self, url, page_size):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'page_size': page_size})
+        self.assertEqual(len(response.data['results']), page_size)
+        return len(queries)
+
+    def test_post_list_query_count_is_constant(self):
+        self.assertEqual(
+            self.count_queries('/api/posts/posts/', 2),
+            self.count_queries('/api/posts/posts/', 8),
+        )
+
+    def test_feed_query_count_is_constant(self):
+        self.assertEqual(
+            self.count_queries('/api/posts/feed/', 2),
+            self.count_queries('/api/posts/feed/', 8),
+        )
+
+    def test_nested_comments_are_capped(self):
+        response = self.client.get('/api/posts/posts/', {'page_size': 1})
+        post = response.data['results'][0]
+        self.assertEqual(len(post['comments']), 3)
+        self.assertEqual(post['comment_count'], 5)
+
+
+class PostCounterTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='writer', password='pass12345')
+        self.post = Post.objects.create(author=self.user, title='counted', content='...')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_like_and_unlike_maintain_like_count(self):
+        self.client.post(f'/api/posts/posts/{self.post.pk}/like/')
+        self.client.post(f'/api/posts/posts/{self.post.pk}/like/')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+
+        self.client.post(f'/api/posts/posts/{self.post.pk}/unlike/')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)
+
+    def test_comment_create_and_destroy_maintain_comment_count(self):
+        response = self.client.post('/api/posts/comments/', {'post': self.post.pk, 'content': 'hi'})
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+
+        self.client.delete(f'/api/posts/comments/{response.data["id"]}/')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 0)
+
+    def test_reconcile_command_repairs_drift(self):
+        self.post.comments.create(author=self.user, content='not counted')
+        Post.objects.filter(pk=self.post.pk).update(like_count=7)
+
+        call_command('reconcile_post_counters', batch_size=1, stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.like_count, self.post.comment_count), (0, 1))
+
+
+# The test runner is a single process, so its LocMemCache is shared enough
+@override_settings(RESPONSE_CACHE_ALLOW_LOCAL=True)
+class ResponseCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='writer', password='pass12345')
+        self.post = Post.objects.create(author=self.user, title='cached', content='...')
+        self.client = APIClient()
+
+    def test_repeated_reads_are_served_from_cache(self):
+        before = cache_stats()
+        first = self.client.get('/api/posts/posts/')
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get('/api/posts/posts/')
+        self.assertEqual((first['X-Cache'], second['X-Cache']), ('MISS', 'HIT'))
+        # Neither the cache nor the conditional-GET validators touch the database.
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(second.data, first.data)
+        after = cache_stats()
+        self.assertEqual(after['hits'] - before['hits'], 1)
+        self.assertEqual(after['misses'] - before['misses'], 1)
+
+    def test_query_params_and_auth_scope_are_part_of_the_key(self):
+        self.client.get('/api/posts/posts/')
+        self.assertEqual(self.client.get('/api/posts/posts/', {'page_size': 1})['X-Cache'], 'MISS')
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get('/api/posts/posts/')['X-Cache'], 'MISS')
+
+    def test_writes_invalidate_cached_responses(self):
+        url = f'/api/posts/posts/{self.post.pk}/'
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.comments.create(author=self.user, content='fresh')
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['comments'][0]['content'], 'fresh')
+
+    def test_only_rendered_user_fields_invalidate(self):
+        url = f'/api/posts/posts/{self.post.pk}/'
+        self.client.get(url)
+        self.user.bio = 'edited'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+            update_last_login(None, self.user)
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+        self.user.username = 'renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['author'], 'renamed')
+
+
+# The test runner is a single process, so its LocMemCache is shared enough
+@override_settings(RESPONSE_CACHE_ALLOW_LOCAL=True)
+class ConditionalGetTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='writer', password='pass12345')
+        self.post = Post.objects.create(author=self.user, title='polled', content='...')
+        self.client = APIClient()
+
+    def test_unchanged_list_returns_304_without_queries(self):
+        etag = self.client.get('/api/posts/posts/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/posts/posts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_each_page_has_its_own_etag(self):
+        etag = self.client.get('/api/posts/posts/')['ETag']
+        paged = self.client.get('/api/posts/posts/', {'page_size': 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(paged.status_code, 200)
+        self.assertNotEqual(paged['ETag'], etag)
+
+    def test_comment_changes_post_etag(self):
+        url = f'/api/posts/posts/{self.post.pk}/'
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.comments.create(author=self.user, content='new')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_edited_comment_is_not_modified_only_until_saved(self):
+        comment = self.post.comments.create(author=self.user, content='first')
+        url = f'/api/posts/comments/{comment.pk}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        comment.content = 'edited'
+        with self.captureOnCommitCallbacks(execute=True):
+            comment.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @override_settings(RESPONSE_CACHE_ALLOW_LOCAL=False)
+    def test_process_local_cache_sends_no_validators(self):
+        response = self.client.get('/api/posts/posts/')
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('X-Cache', response)
+
+    def test_missing_object_is_still_404(self):
+        response = self.client.get('/api/posts/posts/999999/', HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,123 @@
+"""Materialized home timelines.
+
+Posts are copied into each follower's timeline when they are written
+(fan-out on write), so reading a feed page is one range scan over
+``TimelineEntry``.  Authors with more than ``TIMELINE_FANOUT_MAX_FOLLOWERS``
+followers are skipped at write time; their posts are pulled in when the feed
+is read (fan-out on read) and merged with the materialized page.
+"""
+from itertools import islice
+
+from django.conf import settings
+
+from accounts.models import CustomUser, Follow
+
+from .models import Post, TimelineEntry
+from .pagination import older_than
+
+DEFAULT_FANOUT_MAX_FOLLOWERS = 5000
+DEFAULT_BACKFILL_SIZE = 200
+BATCH_SIZE = 1000
+
+
+def fanout_max_followers():
+    return getattr(settings, 'TIMELINE_FANOUT_MAX_FOLLOWERS', DEFAULT_FANOUT_MAX_FOLLOWERS)
+
+
+def backfill_size():
+    return getattr(settings, 'TIMELINE_BACKFILL_SIZE', DEFAULT_BACKFILL_SIZE)
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def is_fanned_out(author_id):
+    """Return True if posts by ``author_id`` are materialized on write."""
+    followers = CustomUser.objects.filter(pk=author_id).values_list('followers_count', flat=True).first()
+    return (followers or 0) <= fanout_max_followers()
+
+
+def pulled_author_ids(user):
+    """Ids of the accounts ``user`` follows whose posts are read on demand."""
+    return list(
+        user.following
+        .filter(followers_count__gt=fanout_max_followers())
+        .values_list('pk', flat=True)
+    )
+
+
+def _entries(owner_ids, post_rows):
+    return [
+        TimelineEntry(owner_id=owner_id, post_id=post_id, author_id=author_id, created_at=created_at)
+        for owner_id in owner_ids
+        for post_id, author_id, created_at in post_rows
+    ]
+
+
+def fan_out_post(post):
+    """Copy ``post`` into the timeline of every follower of its author."""
+    if not is_fanned_out(post.author_id):
+        return
+    row = [(post.pk, post.author_id, post.created_at)]
+    follower_ids = (
+        Follow.objects
+        .filter(followed_id=post.author_id)
+        .values_list('follower_id', flat=True)
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    for owner_ids in _batched(follower_ids, BATCH_SIZE):
+        TimelineEntry.objects.bulk_create(_entries(owner_ids, row), ignore_conflicts=True)
+
+
+def backfill(owner_ids, author_ids):
+    """Seed new followers' timelines with recent posts of the followed authors."""
+    for author_id in author_ids:
+        if not is_fanned_out(author_id):
+            continue
+        rows = list(
+            Post.objects
+            .filter(author_id=author_id)
+            .order_by('-created_at', '-id')
+            .values_list('id', 'author_id', 'created_at')[:backfill_size()]
+        )
+        if rows:
+            TimelineEntry.objects.bulk_create(
+                _entries(owner_ids, rows), batch_size=BATCH_SIZE, ignore_conflicts=True
+            )
+
+
+def prune(owner_ids, author_ids):
+    """Drop posts by ``author_ids`` from the timelines of ``owner_ids``."""
+    TimelineEntry.objects.filter(owner_id__in=owner_ids, author_id__in=author_ids).delete()
+
+
+def home_timeline(user, limit, before=None):
+    """Return up to ``limit`` posts for ``user``'s feed, newest first.
+
+    ``before`` is an optional ``(created_at, id)`` position; only posts strictly
+    older than it are returned. Positions are read from the indexes alone and
+    the page is then loaded with ``Post.objects.for_display()``.
+    """
+    entries = TimelineEntry.objects.filter(owner=user)
+    if before is not None:
+        entries = entries.filter(older_than(*before, pk_field='post_id'))
+    positions = list(
+        entries.order_by('-created_at', '-post_id').values_list('created_at', 'post_id')[:limit]
+    )
+
+    pulled = pulled_author_ids(user)
+    if pulled:
+        extra = Post.objects.filter(author_id__in=pulled)
+        if before is not None:
+            extra = extra.filter(older_than(*before))
+        # An author who crossed the threshold may still have materialized rows.
+        positions = sorted(
+            set(positions) | set(extra.order_by('-created_at', '-id').values_list('created_at', 'id')[:limit]),
+            reverse=True,
+        )[:limit]
+
+    posts = Post.objects.for_display().in_bulk([pk for _, pk in positions])
+    return [posts[pk] for _, pk in positions if pk in posts]
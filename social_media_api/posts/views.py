@@ -1,10 +1,17 @@
 from rest_framework import viewsets, filters, permissions, generics
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from accounts.models import CustomUser
+from .caching import CachedResponseMixin
+from .conditional import ConditionalGetMixin
 from .models import Post, Comment, Like
+from .pagination import KeysetPagination
 from .serializers import PostSerializer, CommentSerializer
-from notifications.models import Notification
+from .timeline import home_timeline
+from notifications.dispatch import notify
 
 
 
@@ -14,44 +21,71 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
             return True
         return obj.author == request.user
 
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
-
-class PostViewSet(viewsets.ModelViewSet):
-    queryset = Post.objects.all()
+class PostViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    queryset = Post.objects.for_display()
+    # Posts embed their latest comments and their author's username.
+    cache_models = (Post, Comment, Like, CustomUser)
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
+
+    def perform_create(self, serializer):
+        serializer.save(author=self.request.user)
 
     @action(detail=True, methods=['POST'])
     def like(self, request, pk=None):
         post = generics.get_object_or_404(Post, pk=pk)
-        like, created = Like.objects.get_or_create(user=request.user, post=post)
+        with transaction.atomic():
+            like, created = Like.objects.get_or_create(user=request.user, post=post)
+            if created:
+                Post.objects.bump(post.pk, like_count=1)
+                notify(recipient=post.author, actor=request.user, verb='liked your post', target=post)
         if created:
-            Notification.objects.create(
-                recipient=post.author,
-                actor=request.user,
-                verb='liked your post',
-                target=post
-            )
             return Response({'status': 'post liked'})
         return Response({'status': 'already liked'})
 
-class CommentViewSet(viewsets.ModelViewSet):
-    queryset = Comment.objects.all()
+    @action(detail=True, methods=['POST'])
+    def unlike(self, request, pk=None):
+        post = generics.get_object_or_404(Post, pk=pk)
+        with transaction.atomic():
+            deleted, _ = Like.objects.filter(user=request.user, post=post).delete()
+            if deleted:
+                Post.objects.bump(post.pk, like_count=-1)
+        return Response({'status': 'post unliked'})
+
+class CommentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = Comment.objects.select_related('author')
+    # Comments embed their author's username.
+    cache_models = (Comment, CustomUser)
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = KeysetPagination
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        comment = serializer.save(author=self.request.user)
+        Post.objects.bump(comment.post_id, comment_count=1)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        previous_post_id = serializer.instance.post_id
+        comment = serializer.save()
+        if comment.post_id != previous_post_id:
+            Post.objects.bump(previous_post_id, comment_count=-1)
+            Post.objects.bump(comment.post_id, comment_count=1)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+        Post.objects.bump(instance.post_id, comment_count=-1)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def feed(request):
-    following_users = request.user.following.all()
-    posts = Post.objects.filter(author__in=following_users).order_by('-created_at')
+    paginator = KeysetPagination()
+    posts = paginator.paginate(
+        request, lambda before, limit: home_timeline(request.user, limit, before=before)
+    )
     serializer = PostSerializer(posts, many=True)
-    return Response(serializer.data)
\ No newline at end of file
+    return paginator.get_paginated_response(serializer.data)
@@ -48,7 +48,7 @@ AUTH_USER_MODEL = 'accounts.CustomUser'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.CachedTokenAuthentication',
     ],
 }
 MIDDLEWARE = [
@@ -103,6 +103,20 @@ DATABASES = {
     }
 }
 
+# Cache
+# Local memory by default; point CACHE_BACKEND at
+# django.core.cache.backends.redis.RedisCache and CACHE_LOCATION at
+# redis://host:6379/0 in production. Response caching and conditional GET
+# need a cache every worker shares and stay off with local memory, unless
+# RESPONSE_CACHE_ALLOW_LOCAL = True for a single-process server.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 